@@ -5,18 +5,72 @@ AI-powered Big Five Aspect Scale assessment with LLM interpretation.
 
 import streamlit as st
 import json
+import logging
 import os
+import time
+from dataclasses import asdict
 from dotenv import load_dotenv
 from anthropic import Anthropic
 
 # Import scoring engine
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'exportedResearch'))
-from bfas_scoring import calculate_all_scores, format_profile_summary
+from bfas_scoring import calculate_all_scores, format_profile_summary, load_cdf_tables, validate_scoring_mode
+from bfas_response_quality import (
+    ITEMS_PER_PAGE, assess_partial_quality, assess_response_quality, format_response_quality
+)
+from bfas_adaptive import ESTIMATION_METHOD, AdaptiveSession, load_item_bank
+from bfas_session_store import SessionStore, new_resume_token
+from bfas_templates import LOCAL_INTERPRETATION_MODES, TEMPLATE_LANGUAGE, generate_local_interpretation
+from bfas_prompt import build_interpretation_prompt
+from bfas_cache import cache_key, create_cache
+from bfas_comparison import ASPECTS, ProfileSeries
+from bfas_locales import (
+    available_locales, load_locale_pack, load_knowledge_base as load_locale_knowledge_base,
+    load_snippet_index, resolve_locale
+)
+from bfas_metrics import (
+    DEFAULT_HTTP_HOST, timed, record_llm_usage, record_prompt_report, record_cache_lookup, record_cache_miss,
+    record_page_entry, start_http_exporter, start_file_sink
+)
 
 # Load environment
 load_dotenv()
 
+# Percentile scoring mode: 'normal' (z-score CDF) or 'empirical' (lookup arrays)
+SCORING_MODE = os.getenv('BFAS_SCORING_MODE', 'normal')
+validate_scoring_mode(SCORING_MODE)  # fail at startup, not on the first results page
+
+# Observed percentile tables for 'empirical' mode (bfas_item_analysis.py cdf-tables);
+# without them the lookup arrays are derived from the published norms
+CDF_TABLES_PATH = os.getenv('BFAS_CDF_TABLES')
+
+# Adaptive short form is enabled by pointing this at calibrated item parameters
+ITEM_PARAMETERS_PATH = os.getenv('BFAS_ITEM_PARAMETERS')
+
+# Local SQLite file for resumable in-progress assessments
+SESSION_DB_PATH = os.getenv('BFAS_SESSION_DB', '.bfas_sessions.sqlite3')
+
+# Metrics exposition: scrape endpoint port and/or textfile sink path
+METRICS_PORT = os.getenv('BFAS_METRICS_PORT')
+METRICS_HOST = os.getenv('BFAS_METRICS_HOST', DEFAULT_HTTP_HOST)
+METRICS_FILE = os.getenv('BFAS_METRICS_FILE')
+
+# Offline template interpretation: 'preview' (shown until the LLM text arrives,
+# and kept if the call fails), 'fallback' (only on failure) or 'only' (no LLM call)
+LOCAL_INTERPRETATION = os.getenv('BFAS_LOCAL_INTERPRETATION', 'preview')
+if LOCAL_INTERPRETATION not in LOCAL_INTERPRETATION_MODES:
+    raise ValueError(f"BFAS_LOCAL_INTERPRETATION must be one of {list(LOCAL_INTERPRETATION_MODES)}, "
+                     f"got {LOCAL_INTERPRETATION!r}")
+
+# Interpretation cache: 'memory' (per process) or 'sqlite' (shared by replicas on a host)
+CACHE_BACKEND = os.getenv('BFAS_CACHE_BACKEND', 'memory')
+CACHE_PATH = os.getenv('BFAS_CACHE_PATH', '.bfas_cache.sqlite3')
+
+LLM_MODEL = "claude-haiku-4-5"
+
+logger = logging.getLogger(__name__)
+
 # Page config
 st.set_page_config(
     page_title="BFAS Personality Assessment",
@@ -73,68 +127,171 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Load instrument
-@st.cache_data
-def load_instrument():
-    with open('exportedResearch/bfas_instrument.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-# Load RAG knowledge base
-@st.cache_data
-def load_knowledge_base():
-    with open('exportedResearch/BFAS_Complete_RAG_Knowledge_Base.md', 'r', encoding='utf-8') as f:
-        return f.read()
-
-
-def generate_interpretation(profile_summary: dict, knowledge_base: str) -> str:
+# Start metrics exporters once per process
+@st.cache_resource
+def start_metrics_exporters():
+    if METRICS_PORT:
+        start_http_exporter(int(METRICS_PORT), host=METRICS_HOST)
+    if METRICS_FILE:
+        start_file_sink(METRICS_FILE)
+    return True
+
+
+# Register observed percentile tables once per process
+@st.cache_resource
+def load_percentile_tables():
+    return load_cdf_tables(CDF_TABLES_PATH) if CDF_TABLES_PATH else 0
+
+
+# Load the locale pack (items, scale labels, gender options); one shared copy per locale
+@st.cache_resource
+def load_instrument(locale: str):
+    record_cache_miss('instrument')
+    return load_locale_pack(locale)
+
+
+# Load RAG knowledge base for a locale
+@st.cache_resource
+def load_knowledge_base(locale: str):
+    record_cache_miss('knowledge_base')
+    return load_locale_knowledge_base(locale)
+
+
+# Snippet index for the local (template) interpretation of a locale
+@st.cache_resource
+def load_interpretation_index(locale: str):
+    record_cache_miss('snippet_index')
+    return load_snippet_index(locale)
+
+
+# Load adaptive item bank (None when the short form is not configured or the
+# bank was not stamped as passing benchmarks/bench_adaptive.py)
+@st.cache_resource
+def load_adaptive_bank():
+    if not ITEM_PARAMETERS_PATH:
+        return None
+    bank = load_item_bank(ITEM_PARAMETERS_PATH)
+    if not bank.validated:
+        logger.warning("%s has no passing adaptive benchmark stamp; using the full form",
+                       ITEM_PARAMETERS_PATH)
+        return None
+    return bank
+
+
+# Session checkpoint store (shared by all sessions in this process)
+@st.cache_resource
+def get_session_store():
+    return SessionStore(SESSION_DB_PATH)
+
+
+# Cache for results shared across sessions (and across replicas with the sqlite backend).
+# A backend that cannot be opened degrades to a per-process cache; the fallback is
+# cached like any other resource, so the failure is logged once per process.
+@st.cache_resource
+def get_shared_cache():
+    try:
+        return create_cache(CACHE_BACKEND, CACHE_PATH)
+    except Exception:
+        logger.warning("Could not open the %s cache at %s; using an in-process cache",
+                       CACHE_BACKEND, CACHE_PATH, exc_info=True)
+        return create_cache('memory')
+
+
+def checkpoint_session():
+    """Queue the in-progress assessment for persistence under its resume token."""
+    token = st.session_state.get('resume_token')
+    if not token:
+        return
+    get_session_store().checkpoint(token, {
+        'page': st.session_state.page,
+        'age': st.session_state.age,
+        'gender': st.session_state.gender,
+        'locale': st.session_state.locale,
+        'responses': st.session_state.responses,
+        'page_seconds': st.session_state.get('page_seconds', []),
+        'page_items': st.session_state.get('page_items', []),
+        'item_seconds': st.session_state.get('item_seconds', []),
+        'adaptive': st.session_state.get('adaptive_session') is not None
+    })
+
+
+def restore_session() -> bool:
+    """Restore an interrupted assessment from the ?resume= token, if any."""
+    token = st.query_params.get('resume')
+    if not token:
+        return False
+    state = get_session_store().load(token)
+    if state is None:
+        del st.query_params['resume']
+        return False
+
+    # JSON object keys come back as strings
+    responses = {int(item_id): value for item_id, value in state['responses'].items()}
+    st.session_state.resume_token = token
+    st.session_state.page = state['page']
+    st.session_state.age = state['age']
+    st.session_state.gender = state['gender']
+    st.session_state.locale = resolve_locale(state.get('locale'))
+    st.session_state.responses = responses
+    st.session_state.page_seconds = state['page_seconds']
+    # Checkpoints written before page sizes were recorded only had full pages
+    st.session_state.page_items = state.get('page_items') or [ITEMS_PER_PAGE] * len(state['page_seconds'])
+    st.session_state.item_seconds = state.get('item_seconds', [])
+    st.session_state.adaptive_session = None
+
+    bank = load_adaptive_bank() if state['adaptive'] else None
+    if bank is not None:
+        session = AdaptiveSession(bank, age=state['age'], gender=state['gender'])
+        for item_id, value in responses.items():
+            session.record(item_id, value)
+        st.session_state.adaptive_session = session
+    elif state['adaptive']:
+        # Short form no longer configured; continue on the full form
+        st.session_state.page = 'assessment'
+    return True
+
+
+def generate_interpretation(profile_summary: dict, knowledge_base: str, language: str = 'English') -> str:
     """Generate natural language interpretation using Claude."""
+    with timed('prompt_build'):
+        prompt, report = build_interpretation_prompt(profile_summary, knowledge_base, language)
+
+    # Same prompt, same interpretation: reuse it from any session or replica
+    cache = get_shared_cache()
+    key = cache_key(LLM_MODEL, prompt)
+    record_cache_lookup('interpretation')
+    try:
+        cached = cache.get('interpretation', key)
+    except Exception:
+        # An unreadable cache (e.g. a locked SQLite file) is only a miss
+        logger.warning("Interpretation cache read failed", exc_info=True)
+        cached = None
+    if cached is not None:
+        st.session_state.prompt_report = cached['prompt_report']
+        return cached['text']
+    record_cache_miss('interpretation')
+    record_prompt_report(report)
+
     client = Anthropic()
 
-    prompt = f"""You are an expert personality psychologist interpreting BFAS (Big Five Aspect Scale) results.
-
-KNOWLEDGE BASE:
-{knowledge_base}
-
-PROFILE DATA:
-{json.dumps(profile_summary, indent=2)}
-
-Generate a personalized, engaging interpretation (800-1200 words) that:
-
-1. Opens with a brief overview of what makes this profile distinctive
-2. Covers each of the 5 dimensions, highlighting:
-   - The person's percentile scores for both aspects
-   - What these scores mean behaviorally (use specific examples)
-   - Any significant asymmetries between aspects within a dimension
-3. Identifies 2-3 key strengths from the profile
-4. Notes 1-2 potential growth areas (phrased constructively)
-5. If clinical flags are present, mention them sensitively with appropriate disclaimers
-
-IMPORTANT GUIDELINES:
-- Use second person ("you") throughout
-- Be warm but scientifically grounded
-- Avoid clinical/diagnostic language unless flags are present
-- Highlight the unique pattern of aspects, not just domain scores
-- Use the knowledge base for evidence-based interpretations
-- End with an empowering reflection
-- Be concise and direct (eliminate filler words and unnecessary elaboration)
-
-Do NOT include:
-- Rigid structure with headers for each dimension
-- Repetitive percentile listings
-- Generic personality descriptions
-- Medical advice
-- Verbose explanations or redundant phrases
-
-Write in flowing paragraphs that feel personalized and insightful."""
-
-    response = client.messages.create(
-        model="claude-haiku-4-5",
-        max_tokens=2500,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    with timed('llm'):
+        response = client.messages.create(
+            model=LLM_MODEL,
+            max_tokens=2500,
+            messages=[{"role": "user", "content": prompt}]
+        )
+    record_llm_usage(response.usage, LLM_MODEL)
 
-    return response.content[0].text
+    report.input_tokens = getattr(response.usage, 'input_tokens', None)
+    report.output_tokens = getattr(response.usage, 'output_tokens', None)
+    st.session_state.prompt_report = asdict(report)
+
+    text = response.content[0].text
+    try:
+        cache.set('interpretation', key, {'text': text, 'prompt_report': st.session_state.prompt_report})
+    except Exception:
+        logger.warning("Interpretation cache write failed", exc_info=True)
+    return text
 
 
 def render_welcome():
@@ -184,7 +341,19 @@ def render_welcome():
         </div>
         """, unsafe_allow_html=True)
 
-        if st.button("Start Anonymous Assessment (15-20 min)", type="primary", use_container_width=True):
+        # Language of the questionnaire items (only offered when several packs exist)
+        locales = available_locales()
+        if len(locales) > 1:
+            codes = list(locales)
+            locale = st.selectbox("Questionnaire language", options=codes,
+                                  index=codes.index(st.session_state.locale),
+                                  format_func=lambda code: locales[code])
+            if locale != st.session_state.locale:
+                st.session_state.locale = locale
+                st.query_params['lang'] = locale
+
+        duration = "about 13 min" if load_adaptive_bank() is not None else "15-20 min"
+        if st.button(f"Start Anonymous Assessment ({duration})", type="primary", use_container_width=True):
             st.session_state.page = 'demographics'
             st.rerun()
 
@@ -200,6 +369,7 @@ def render_welcome():
                 st.session_state.responses = {i+1: profile['responses'][i] for i in range(100)}
                 st.session_state.age = profile.get('age', 30)
                 st.session_state.gender = profile.get('gender')
+                st.session_state.adaptive_session = None
                 st.session_state.page = 'results'
                 st.rerun()
 
@@ -221,9 +391,12 @@ def render_demographics():
     with col1:
         age = st.number_input("Age", min_value=17, max_value=100, value=30)
 
+    record_cache_lookup('instrument')
+    pack = load_instrument(st.session_state.locale)
+
     with col2:
         gender = st.selectbox("Gender (optional)",
-                             options=["Prefer not to say", "Male", "Female"],
+                             options=list(pack.gender_options),
                              index=0)
 
     st.markdown("""
@@ -237,18 +410,30 @@ def render_demographics():
     with col2:
         if st.button("Begin Assessment", type="primary", use_container_width=True):
             st.session_state.age = age
-            st.session_state.gender = None if gender == "Prefer not to say" else gender.lower()
+            st.session_state.gender = pack.canonical_gender(gender)
             st.session_state.page = 'assessment'
             st.session_state.responses = {}
             st.session_state.current_item = 0
+            st.session_state.page_seconds = []
+            st.session_state.page_items = []
+            st.session_state.item_seconds = []
+            bank = load_adaptive_bank()
+            st.session_state.adaptive_session = (
+                AdaptiveSession(bank, age=age, gender=st.session_state.gender)
+                if bank is not None else None
+            )
+            st.session_state.resume_token = new_resume_token()
+            st.query_params['resume'] = st.session_state.resume_token
+            checkpoint_session()
             st.rerun()
 
 
 def render_assessment():
     """Render the questionnaire."""
-    instrument = load_instrument()
-    items = instrument['items']
-    scale_labels = instrument['instrument']['scale']['labels']
+    record_cache_lookup('instrument')
+    pack = load_instrument(st.session_state.locale)
+    items = pack.items
+    scale_labels = pack.scale_labels
 
     # Initialize responses if needed
     if 'responses' not in st.session_state:
@@ -261,9 +446,20 @@ def render_assessment():
                 f"~{max(1, int((100 - len(st.session_state.responses)) * 0.15))} minutes remaining")
 
     # Display items in batches of 10 (one aspect at a time)
-    current_aspect_start = (len(st.session_state.responses) // 10) * 10
+    # First block with an unanswered item; answers need not be contiguous
+    # (e.g. resumed from an adaptive session after the short form was disabled)
+    current_aspect_start = next(
+        (index // 10 * 10 for index, item in enumerate(items)
+         if item['id'] not in st.session_state.responses),
+        len(items)
+    )
     current_items = items[current_aspect_start:current_aspect_start + 10]
 
+    # Time each page from first render to submit (for response-quality screening)
+    if st.session_state.get('page_timer_start') != current_aspect_start:
+        st.session_state.page_timer_start = current_aspect_start
+        st.session_state.page_started_at = time.monotonic()
+
     if current_items:
         aspect_name = current_items[0]['aspect'].replace('_', ' ').title()
         dimension_name = current_items[0]['dimension'].replace('_', ' ').title()
@@ -296,10 +492,15 @@ def render_assessment():
             with col2:
                 if st.form_submit_button("Continue", type="primary", use_container_width=True):
                     st.session_state.responses.update(responses_batch)
+                    st.session_state.setdefault('page_seconds', []).append(
+                        time.monotonic() - st.session_state.page_started_at
+                    )
+                    st.session_state.setdefault('page_items', []).append(len(responses_batch))
 
                     # Check if complete
                     if len(st.session_state.responses) >= 100:
                         st.session_state.page = 'results'
+                    checkpoint_session()
                     st.rerun()
     else:
         # Should not happen, but safety
@@ -307,32 +508,187 @@ def render_assessment():
         st.rerun()
 
 
+def render_adaptive_assessment():
+    """Render the adaptive short form, one item at a time."""
+    record_cache_lookup('instrument')
+    pack = load_instrument(st.session_state.locale)
+    items = {item['id']: item for item in pack.items}
+    scale_labels = pack.scale_labels
+    session = st.session_state.adaptive_session
+
+    item_id = session.next_item()
+    if item_id is None:
+        st.session_state.page = 'results'
+        st.rerun()
+
+    # Progress is measured in aspects completed; item count varies per person
+    aspects_done = sum(session.aspect_done(a) for a in session.posteriors)
+    st.progress(aspects_done / 10)
+    st.markdown(f"**Question {len(session.responses) + 1}** | "
+                f"{aspects_done} of 10 aspects complete")
+
+    # Time each item from first render to submit (for response-quality screening)
+    if st.session_state.get('item_timer_id') != item_id:
+        st.session_state.item_timer_id = item_id
+        st.session_state.item_started_at = time.monotonic()
+
+    item = items[item_id]
+    with st.form(key=f"adaptive_form_{item_id}"):
+        st.markdown(f"**{item['text']}**")
+        response = st.radio(
+            f"item_{item_id}",
+            options=[1, 2, 3, 4, 5],
+            format_func=lambda x: scale_labels[str(x)],
+            horizontal=True,
+            key=f"radio_{item_id}",
+            label_visibility="collapsed"
+        )
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.form_submit_button("Continue", type="primary", use_container_width=True):
+                session.record(item_id, response)
+                st.session_state.responses[item_id] = response
+                st.session_state.setdefault('item_seconds', []).append(
+                    time.monotonic() - st.session_state.item_started_at
+                )
+                if session.finished():
+                    st.session_state.page = 'results'
+                checkpoint_session()
+                st.rerun()
+
+
+def render_comparison(summary: dict, administration: dict):
+    """Compare this result with earlier downloads and observer ratings of the same person."""
+    st.markdown("### Compare Over Time or With Others")
+    col1, col2 = st.columns(2)
+    with col1:
+        earlier_files = st.file_uploader("Your earlier results (JSON downloads)", type='json',
+                                         accept_multiple_files=True, key='compare_self')
+    with col2:
+        observer_files = st.file_uploader("Ratings of you by others (JSON downloads)", type='json',
+                                          accept_multiple_files=True, key='compare_observers')
+    if not earlier_files and not observer_files:
+        return
+
+    try:
+        earlier = sorted((json.load(f) for f in earlier_files or []),
+                         key=lambda result: result.get('completed_at') or '')
+        observers = [json.load(f) for f in observer_files or []]
+        # Observer ratings carry the raters' own norms; score them on the subject's
+        meta = summary['metadata']
+        series = ProfileSeries(subject_age=meta['age'], subject_gender=meta['gender'],
+                               scoring_mode=SCORING_MODE)
+        for i, result in enumerate(earlier, 1):
+            series.add_self(result, result.get('completed_at') or f'Earlier #{i}')
+        series.add_self({'scores': summary, 'administration': administration}, 'Now')
+        for result in observers:
+            series.add_observer(result)
+    except (ValueError, KeyError, TypeError) as e:
+        st.error(f"Could not read the uploaded results: {e}")
+        return
+
+    label = lambda aspect: aspect.replace('_', ' ').title()
+    change = series.change_from_baseline()
+    if change is not None:
+        st.markdown(f"**Change since {change.from_label}**")
+        st.table([
+            {'Aspect': label(a),
+             'Percentile change': f"{change.delta_percentile[a]:+d}",
+             'Raw change': f"{change.delta_raw[a]:+d}",
+             'Reliable change index': f"{change.rci[a]:+.2f}",
+             'Reliable?': change.reliable_changes.get(a, '—')}
+            for a in ASPECTS
+        ])
+        if change.reliable_changes:
+            st.info("Changes marked reliable exceed what measurement error alone would "
+                    "produce (|RCI| ≥ 1.96).")
+        else:
+            st.info("None of the differences exceed what measurement error alone would produce.")
+        if change.estimated:
+            st.caption("One of these results is from the short form, whose scores are partly "
+                       "estimated; treat small changes with extra caution.")
+
+    agreement = series.agreement()
+    if agreement is not None:
+        st.markdown(f"**How you see yourself vs. {agreement.n_observers} "
+                    f"other rater{'s' if agreement.n_observers > 1 else ''}**")
+        current = summary['aspect_scores']
+        st.table([
+            {'Aspect': label(a),
+             'You': current[a]['percentile'],
+             'Others': agreement.observer_percentile[a],
+             'Gap (SD units)': f"{agreement.self_minus_other_z[a]:+.2f}"}
+            for a in ASPECTS
+        ])
+        if agreement.profile_correlation is not None:
+            st.caption(f"Profile agreement r = {agreement.profile_correlation:.2f}; "
+                       f"mean gap {agreement.mean_abs_difference_z:.2f} SD")
+        if agreement.gaps:
+            st.info("Largest differences in perception: "
+                    + ", ".join(label(a) for a in agreement.gaps[:3]))
+        if agreement.estimated:
+            st.caption("Some of these ratings are from the short form, whose scores are partly "
+                       "estimated.")
+
+
 def render_results():
     """Render results page with scores and interpretation."""
     st.markdown('<p class="main-header">Your BFAS Personality Profile</p>', unsafe_allow_html=True)
 
-    # Convert responses dict to ordered list
-    responses_list = [st.session_state.responses[i] for i in range(1, 101)]
+    adaptive_session = st.session_state.get('adaptive_session')
 
     # Calculate scores
-    with st.spinner("Calculating your scores..."):
-        profile = calculate_all_scores(
-            responses_list,
-            st.session_state.age,
-            st.session_state.gender
-        )
+    with st.spinner("Calculating your scores..."), timed('scoring'):
+        if adaptive_session is not None:
+            profile = adaptive_session.to_profile(
+                st.session_state.age,
+                st.session_state.gender,
+                scoring_mode=SCORING_MODE
+            )
+            # Screen the items actually given, in administration order
+            quality = assess_partial_quality(
+                adaptive_session.responses,
+                st.session_state.get('item_seconds') or None
+            )
+            administration = {'method': 'adaptive', 'items_administered': len(adaptive_session.responses),
+                              'estimation': ESTIMATION_METHOD}
+        else:
+            # Convert responses dict to ordered list
+            responses_list = [st.session_state.responses[i] for i in range(1, 101)]
+            profile = calculate_all_scores(
+                responses_list,
+                st.session_state.age,
+                st.session_state.gender,
+                scoring_mode=SCORING_MODE
+            )
+            page_seconds = st.session_state.get('page_seconds') or None
+            page_items = st.session_state.get('page_items') or None
+            quality = assess_response_quality(
+                responses_list,
+                page_seconds,
+                page_items if page_seconds and len(page_items or []) == len(page_seconds) else None
+            )
+            administration = {'method': 'full', 'items_administered': len(responses_list), 'estimation': None}
         summary = format_profile_summary(profile)
 
     # Store for potential reuse
     st.session_state.profile_summary = summary
 
+    # Assessment is complete; drop the checkpoint so no answers are retained
+    if st.session_state.get('resume_token'):
+        get_session_store().delete(st.session_state.resume_token)
+        st.session_state.resume_token = None
+        if 'resume' in st.query_params:
+            del st.query_params['resume']
+
     # Display scores visualization
     st.markdown("### Your Scores at a Glance")
 
     # Create two columns for the chart
     col1, col2 = st.columns([2, 1])
 
-    with col1:
+    with col1, timed('render_chart'):
         # Aspect scores chart
         import plotly.graph_objects as go
 
@@ -396,6 +752,9 @@ def render_results():
         - Age: {summary['metadata']['age']}
         - Norms: {summary['metadata']['norm_set']}
         """)
+        if administration['method'] == 'adaptive':
+            st.caption(f"Short form: {administration['items_administered']} of 100 statements. "
+                       "Scores for the remaining statements are estimated from your answers.")
 
     # Clinical flags warning
     if summary['clinical_flags']:
@@ -407,6 +766,9 @@ def render_results():
         If you have concerns about your mental health, please consult a licensed professional.
         </div>
         """, unsafe_allow_html=True)
+        if administration['method'] == 'adaptive':
+            st.caption("These patterns come from the short form, where some aspect scores are "
+                       "estimates; the full assessment gives the most reliable picture.")
 
         for flag in summary['clinical_flags']:
             with st.expander(f"Pattern: {flag['pattern'].replace('_', ' ').title()}"):
@@ -427,16 +789,79 @@ def render_results():
     st.markdown("---")
     st.markdown("### Your Personalized Interpretation")
 
-    with st.spinner("Generating your personalized profile interpretation... (30-60 seconds)"):
-        try:
-            knowledge_base = load_knowledge_base()
-            interpretation = generate_interpretation(summary, knowledge_base)
-            st.session_state.interpretation = interpretation
-        except Exception as e:
-            interpretation = f"Unable to generate interpretation: {str(e)}"
-            st.error(interpretation)
+    # Careless protocols are not worth a paid interpretation call (dev profiles bypass)
+    if quality is not None and not quality.valid and os.getenv('DEV_MODE') != '1':
+        st.warning("Your answers show a pattern (for example many identical answers in a row, "
+                   "or pages completed very quickly) that makes a reliable interpretation "
+                   "impossible. Please retake the assessment when you have time to answer "
+                   "each statement carefully.")
+        interpretation = ''
+        st.session_state.interpretation_source = None
+    else:
+        record_cache_lookup('instrument')
+        pack = load_instrument(st.session_state.locale)
+
+        # Templates only exist in one language; other locales wait for the LLM
+        local_interpretation = None
+        if pack.interpretation_language == TEMPLATE_LANGUAGE:
+            record_cache_lookup('snippet_index')
+            index = load_interpretation_index(st.session_state.locale)
+            with timed('local_interpretation'):
+                local_interpretation = generate_local_interpretation(summary, index)
+
+        # Widget reruns (e.g. comparison uploads) re-enter this page; keep the
+        # outcome already reached for the same profile, including a failed LLM
+        # call and its fallback, so one results view makes at most one call
+        interpretation_key = (st.session_state.locale, json.dumps(summary, sort_keys=True))
+        reuse = st.session_state.get('interpretation_key') == interpretation_key
+
+        # The local text renders instantly; the LLM text replaces it in place
+        notice = st.empty()
+        placeholder = st.empty()
+        if LOCAL_INTERPRETATION in ('preview', 'only') and local_interpretation and not reuse:
+            placeholder.markdown(local_interpretation)
+
+        if LOCAL_INTERPRETATION == 'only' and local_interpretation:
+            interpretation, source = local_interpretation, 'local'
+        elif reuse:
+            interpretation = st.session_state.interpretation
+            source = st.session_state.interpretation_source
+            if st.session_state.get('interpretation_notice'):
+                level, message = st.session_state.interpretation_notice
+                getattr(notice, level)(message)
+            placeholder.markdown(interpretation)
+        else:
+            st.session_state.interpretation_notice = None
+            with st.spinner("Generating your personalized profile interpretation... (30-60 seconds)"):
+                try:
+                    record_cache_lookup('knowledge_base')
+                    with timed('load_knowledge_base'):
+                        knowledge_base = load_knowledge_base(st.session_state.locale)
+                    interpretation = generate_interpretation(summary, knowledge_base,
+                                                             pack.interpretation_language)
+                    source = 'llm'
+                except Exception as e:
+                    if local_interpretation:
+                        interpretation, source = local_interpretation, 'local'
+                        st.session_state.interpretation_notice = (
+                            'info', "The detailed AI interpretation is unavailable right now "
+                                    f"({type(e).__name__}); showing the standard interpretation instead.")
+                    else:
+                        interpretation, source = '', None
+                        st.session_state.interpretation_notice = (
+                            'warning', "The interpretation is unavailable right now "
+                                       f"({type(e).__name__}). Your scores above are complete; "
+                                       "please try again later.")
+                    level, message = st.session_state.interpretation_notice
+                    getattr(notice, level)(message)
+            placeholder.markdown(interpretation)
+
+        st.session_state.interpretation = interpretation
+        st.session_state.interpretation_source = source
+        st.session_state.interpretation_key = interpretation_key
 
-    st.markdown(interpretation)
+    st.markdown("---")
+    render_comparison(summary, administration)
 
     # Actions
     st.markdown("---")
@@ -445,8 +870,14 @@ def render_results():
     with col2:
         # Download results as JSON
         results_json = json.dumps({
+            'completed_at': time.strftime('%Y-%m-%d'),
             'scores': summary,
-            'interpretation': st.session_state.get('interpretation', '')
+            'administration': administration,
+            'response_quality': format_response_quality(quality) if quality is not None else None,
+            'interpretation': st.session_state.get('interpretation', ''),
+            'interpretation_source': st.session_state.get('interpretation_source'),
+            'prompt': (st.session_state.get('prompt_report')
+                       if st.session_state.get('interpretation_source') == 'llm' else None)
         }, indent=2)
         st.download_button(
             "Download Results (JSON)",
@@ -457,28 +888,45 @@ def render_results():
         )
 
     st.markdown("---")
-    st.markdown("""
-    <div style="text-align: center; color: #999; font-size: 0.85em;">
-    Interpretation generated by Claude Haiku 4.5
-    </div>
-    """, unsafe_allow_html=True)
+    if st.session_state.get('interpretation_source') == 'llm':
+        st.markdown("""
+        <div style="text-align: center; color: #999; font-size: 0.85em;">
+        Interpretation generated by Claude Haiku 4.5
+        </div>
+        """, unsafe_allow_html=True)
 
 
 def main():
     """Main app entry point."""
+    start_metrics_exporters()
+    load_percentile_tables()
+
     # Initialize session state
+    if 'locale' not in st.session_state:
+        st.session_state.locale = resolve_locale(st.query_params.get('lang'))
     if 'page' not in st.session_state:
         st.session_state.page = 'welcome'
+        restore_session()
+
+    # Funnel: count each session's arrival on a page once
+    page = st.session_state.page
+    if st.session_state.get('last_page') != page:
+        record_page_entry(page, st.session_state.get('last_page'))
+        st.session_state.last_page = page
 
     # Route to appropriate page
-    if st.session_state.page == 'welcome':
-        render_welcome()
-    elif st.session_state.page == 'demographics':
-        render_demographics()
-    elif st.session_state.page == 'assessment':
-        render_assessment()
-    elif st.session_state.page == 'results':
-        render_results()
+    with timed(f'page_{page}'):
+        if page == 'welcome':
+            render_welcome()
+        elif page == 'demographics':
+            render_demographics()
+        elif page == 'assessment':
+            if st.session_state.get('adaptive_session') is not None:
+                render_adaptive_assessment()
+            else:
+                render_assessment()
+        elif page == 'results':
+            render_results()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""
+Adaptive Short-Form Simulation Benchmark
+Calibrates item parameters on one response set, replays held-out full-form
+response vectors through the adaptive engine, and compares item counts,
+estimated session time, percentiles, clinical flags and within-domain
+asymmetries against full-form scoring.
+
+Usage:
+    python benchmarks/bench_adaptive.py [--calibration responses.csv | --parameters bank.json]
+                                        [--n 1000] [--se 0.42] [--stamp bank.json]
+
+Without --calibration or --parameters, a synthetic GRM population stands in
+for stored data. --stamp writes the benchmarked bank with its results; the
+app only offers the short form from a bank whose stamp passed every gate.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'exportedResearch'))
+from bfas_scoring import ASPECT_RANGES, ASPECT_TO_DIMENSION, REVERSE_ITEMS, ESCS_NORMS, calculate_all_scores
+from bfas_item_analysis import ItemStatistics, iter_csv_chunks
+from bfas_adaptive import (
+    DEFAULT_SE_THRESHOLD, PERCENTILE_TOLERANCE, TOLERANCE_COVERAGE, CUT_OFF_RISK,
+    MIN_FLAG_RECALL, MIN_FLAG_PRECISION, MIN_ASYMMETRY_AGREEMENT,
+    ItemBank, estimate_item_parameters, load_item_bank, save_item_parameters, simulate_session
+)
+
+# Matches the per-item estimate shown in render_assessment (0.15 min)
+SECONDS_PER_ITEM = 9.0
+
+
+def synthetic_population(n: int, seed: int = 0) -> np.ndarray:
+    """Draw raw responses from a GRM per aspect, centred on the ESCS norm means."""
+    rng = np.random.default_rng(seed)
+    gen = np.random.default_rng(1234)  # fixed generating parameters across calls
+    responses = np.zeros((n, 100), dtype=np.int64)
+
+    for aspect, (start, end) in ASPECT_RANGES.items():
+        theta = rng.normal(size=n)
+        shift = (ESCS_NORMS[aspect]['mean'] - 3) * 1.5
+        for item_id in range(start, end + 1):
+            a = gen.uniform(1.2, 2.5)
+            b = np.array([-2.4, -1.0, 0.3, 1.6]) - shift + gen.normal(scale=0.2)
+            cumulative = 1 / (1 + np.exp(-a * (theta[:, None] - b[None, :])))
+            scored = 1 + (rng.random(n)[:, None] < cumulative).sum(axis=1)
+            reverse = item_id in REVERSE_ITEMS[aspect]
+            responses[:, item_id - 1] = 6 - scored if reverse else scored
+    return responses
+
+
+def asymmetry_states(profile) -> dict:
+    """Domain -> higher aspect, or None where no asymmetry is reported."""
+    states = dict.fromkeys(ASPECT_TO_DIMENSION.values())
+    states.update({asym.domain: asym.higher_aspect for asym in profile.asymmetries})
+    return states
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--calibration', help='CSV of stored 100-item responses (header row)')
+    source.add_argument('--parameters', help='benchmark an existing item parameter file')
+    parser.add_argument('--n', type=int, default=1000, help='held-out sessions to simulate')
+    parser.add_argument('--se', type=float, default=DEFAULT_SE_THRESHOLD)
+    parser.add_argument('--cut-off-risk', type=float, default=CUT_OFF_RISK)
+    parser.add_argument('--output', help='write summary JSON here')
+    parser.add_argument('--stamp', help='write the bank with its benchmark results here')
+    args = parser.parse_args()
+
+    if args.parameters:
+        bank = load_item_bank(args.parameters)
+    else:
+        stats = ItemStatistics()
+        if args.calibration:
+            for chunk in iter_csv_chunks(args.calibration):
+                stats.update(chunk)
+        else:
+            stats.update(synthetic_population(20000, seed=1))
+        bank = ItemBank(parameters=estimate_item_parameters(stats))
+
+    held_out = synthetic_population(args.n, seed=2).tolist()
+    with open(os.path.join(os.path.dirname(__file__), '..', 'exportedResearch', 'test_profiles.json')) as f:
+        stored = [p['responses'] for p in json.load(f).values()]
+
+    results = {}
+    for label, sample in (('held_out', held_out), ('test_profiles', stored)):
+        items_used, diffs = [], []
+        full_flags = short_flags = shared_flags = 0
+        asymmetry_matches = asymmetry_total = 0
+        for responses in sample:
+            session = simulate_session(bank, responses, se_threshold=args.se,
+                                       age=40, cut_off_risk=args.cut_off_risk)
+            items_used.append(len(session.responses))
+            short = session.to_profile(age=40)
+            full = calculate_all_scores(responses, age=40)
+            diffs.extend(
+                abs(short.aspect_scores[a].percentile - full.aspect_scores[a].percentile)
+                for a in ASPECT_RANGES
+            )
+            full_patterns = {flag.pattern for flag in full.clinical_flags}
+            short_patterns = {flag.pattern for flag in short.clinical_flags}
+            full_flags += len(full_patterns)
+            short_flags += len(short_patterns)
+            shared_flags += len(full_patterns & short_patterns)
+            full_asym, short_asym = asymmetry_states(full), asymmetry_states(short)
+            asymmetry_matches += sum(full_asym[d] == short_asym[d] for d in full_asym)
+            asymmetry_total += len(full_asym)
+        diffs = np.array(diffs)
+        flag_recall = shared_flags / full_flags if full_flags else 1.0
+        flag_precision = shared_flags / short_flags if short_flags else 1.0
+        asymmetry_agreement = asymmetry_matches / asymmetry_total
+        within_tolerance = bool((diffs <= PERCENTILE_TOLERANCE).mean() >= TOLERANCE_COVERAGE)
+        results[label] = {
+            'sessions': len(sample),
+            'median_items': float(np.median(items_used)),
+            'median_minutes': round(float(np.median(items_used)) * SECONDS_PER_ITEM / 60, 1),
+            'full_form_minutes': round(100 * SECONDS_PER_ITEM / 60, 1),
+            'median_abs_percentile_diff': float(np.median(diffs)),
+            'p90_abs_percentile_diff': float(np.percentile(diffs, 90)),
+            f'within_{PERCENTILE_TOLERANCE}_points': round(float((diffs <= PERCENTILE_TOLERANCE).mean()), 3),
+            'within_tolerance': within_tolerance,
+            'flags_full_form': full_flags,
+            'flags_adaptive': short_flags,
+            'flags_shared': shared_flags,
+            'flag_recall': round(flag_recall, 3),
+            'flag_precision': round(flag_precision, 3),
+            'asymmetry_agreement': round(asymmetry_agreement, 3),
+            'passed': (within_tolerance
+                       and flag_recall >= MIN_FLAG_RECALL
+                       and flag_precision >= MIN_FLAG_PRECISION
+                       and asymmetry_agreement >= MIN_ASYMMETRY_AGREEMENT)
+        }
+
+    # The gate is the held-out population; the stored profiles are a handful of
+    # hand-picked extremes and are reported for inspection only
+    summary = {
+        'se_threshold': args.se,
+        'cut_off_risk': args.cut_off_risk,
+        'passed': results['held_out']['passed'],
+        'results': results
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+    if args.stamp:
+        save_item_parameters(bank.parameters, args.stamp, validation=summary)
+
+
+if __name__ == '__main__':
+    main()
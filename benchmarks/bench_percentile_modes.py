@@ -0,0 +1,85 @@
+"""
+Percentile Mode Benchmark
+Compares the normal-theory and empirical-lookup scoring paths for speed and agreement.
+
+Usage:
+    python benchmarks/bench_percentile_modes.py [n_profiles]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'exportedResearch'))
+from bfas_scoring import (
+    ASPECT_RANGES, NORM_SETS, FEMALE_ADJUSTMENTS, RAW_SCORE_MIN, RAW_SCORE_MAX,
+    calculate_batch_scores, calculate_percentile, get_cdf_tables
+)
+
+
+def make_records(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            'responses': [rng.randint(1, 5) for _ in range(100)],
+            'age': rng.choice([19, 24, 25, 40, 67]),
+            'gender': rng.choice([None, 'male', 'female'])
+        }
+        for _ in range(n)
+    ]
+
+
+def time_mode(records: list, scoring_mode: str) -> tuple:
+    start = time.perf_counter()
+    profiles = calculate_batch_scores(records, scoring_mode=scoring_mode)
+    return time.perf_counter() - start, profiles
+
+
+def table_agreement() -> dict:
+    """Per-aspect max |percentile difference| across every raw total, norm set and gender branch."""
+    worst = {}
+    for norm_set, base_norms in NORM_SETS.items():
+        for female in (False, True):
+            tables = get_cdf_tables(norm_set, female)
+            for aspect, values in base_norms.items():
+                mean = values['mean'] + (FEMALE_ADJUSTMENTS.get(aspect, 0) if female else 0)
+                for raw in range(RAW_SCORE_MIN, RAW_SCORE_MAX + 1):
+                    normal = calculate_percentile(raw / 10, mean, values['sd'])
+                    diff = abs(tables[aspect][raw - RAW_SCORE_MIN] - normal)
+                    worst[aspect] = max(worst.get(aspect, 0), diff)
+    return worst
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    records = make_records(n)
+
+    # Warm the lookup-table cache so it is not charged to the timed run
+    calculate_batch_scores(records[:1], scoring_mode='empirical')
+
+    normal_time, normal_profiles = time_mode(records, 'normal')
+    empirical_time, empirical_profiles = time_mode(records, 'empirical')
+
+    print(f"Profiles scored: {n}")
+    print(f"normal:    {normal_time * 1000:8.1f} ms  ({normal_time / n * 1e6:7.1f} us/profile)")
+    print(f"empirical: {empirical_time * 1000:8.1f} ms  ({empirical_time / n * 1e6:7.1f} us/profile)")
+    print(f"speedup:   {normal_time / empirical_time:8.2f}x")
+
+    diffs = [
+        abs(a.aspect_scores[asp].percentile - b.aspect_scores[asp].percentile)
+        for a, b in zip(normal_profiles, empirical_profiles)
+        for asp in ASPECT_RANGES
+    ]
+    exact = sum(1 for d in diffs if d == 0) / len(diffs)
+    within_5 = sum(1 for d in diffs if d <= 5) / len(diffs)
+    print(f"\nAgreement on random profiles: exact {exact:.1%}, within 5 points {within_5:.1%}, "
+          f"mean |diff| {sum(diffs) / len(diffs):.2f}")
+
+    print("\nMax |percentile diff| per aspect over all raw totals (10-50):")
+    for aspect, diff in table_agreement().items():
+        print(f"  {aspect:16s} {diff:3d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""
+BFAS Benchmark Suite
+Reproducible, fully offline benchmarks for scoring, prompt assembly, app
+cold start and Streamlit page reruns. Results are written as JSON so runs on
+different commits can be compared.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # all benchmarks
+    python benchmarks/run_benchmarks.py --only scoring batch
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+
+Focused benchmarks live alongside: bench_percentile_modes.py, bench_adaptive.py.
+"""
+
+from types import SimpleNamespace
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESEARCH_DIR = os.path.join(REPO_ROOT, 'exportedResearch')
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+sys.path.insert(0, RESEARCH_DIR)
+
+from bfas_scoring import calculate_all_scores, calculate_batch_scores, format_profile_summary
+from bfas_response_quality import compute_quality_indicators
+from bfas_cache import InProcessCache
+
+SEED = 20240101
+
+# A change beyond this ratio is reported as a regression by --compare
+REGRESSION_THRESHOLD = 1.10
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def measure(fn, repeat: int, warmup: int = 1) -> dict:
+    """Run fn repeatedly; return latency summary in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'repeat': repeat,
+        'median_ms': round(statistics.median(samples), 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'mean_ms': round(statistics.fmean(samples), 4)
+    }
+
+
+def load_test_profiles() -> dict:
+    with open(os.path.join(RESEARCH_DIR, 'test_profiles.json'), 'r') as f:
+        return json.load(f)
+
+
+def synthetic_records(n: int, rng: random.Random) -> list:
+    return [
+        {
+            'responses': [rng.randint(1, 5) for _ in range(100)],
+            'age': rng.choice([19, 24, 25, 40, 67]),
+            'gender': rng.choice([None, 'male', 'female'])
+        }
+        for _ in range(n)
+    ]
+
+
+def profile_derived_records(n: int, rng: random.Random) -> list:
+    """Test profiles with ~10% of answers nudged by one scale point."""
+    profiles = list(load_test_profiles().values())
+    records = []
+    for i in range(n):
+        base = profiles[i % len(profiles)]
+        responses = [
+            min(5, max(1, r + rng.choice((-1, 1)))) if rng.random() < 0.1 else r
+            for r in base['responses']
+        ]
+        records.append({'responses': responses, 'age': base.get('age', 30),
+                        'gender': base.get('gender')})
+    return records
+
+
+def git_sha() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class StubAnthropic:
+    """Offline stand-in for anthropic.Anthropic; records prompts, returns canned text."""
+    prompts = []
+
+    def __init__(self, *args, **kwargs):
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, model, max_tokens, messages, **kwargs):
+        prompt = messages[0]['content']
+        StubAnthropic.prompts.append(prompt)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text='Stub interpretation.')],
+            usage=SimpleNamespace(input_tokens=len(prompt) // 4, output_tokens=4,
+                                  cache_read_input_tokens=0, cache_creation_input_tokens=0)
+        )
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def bench_scoring(args) -> dict:
+    """Single-profile calculate_all_scores latency per scoring mode."""
+    responses = load_test_profiles()['sara_phd']['responses']
+    return {
+        mode: measure(lambda: calculate_all_scores(responses, 29, 'female', scoring_mode=mode),
+                      repeat=args.repeat * 20)
+        for mode in ('normal', 'empirical')
+    }
+
+
+def bench_batch(args) -> dict:
+    """Batch throughput over synthetic and test-profile-derived records."""
+    rng = random.Random(SEED)
+    datasets = {
+        'synthetic': synthetic_records(args.batch_size, rng),
+        'test_profiles_derived': profile_derived_records(args.batch_size, rng)
+    }
+    results = {}
+    for name, records in datasets.items():
+        for mode in ('normal', 'empirical'):
+            timing = measure(lambda: calculate_batch_scores(records, scoring_mode=mode),
+                             repeat=args.repeat)
+            timing['profiles_per_second'] = round(len(records) / (timing['median_ms'] / 1000))
+            results[f'{name}/{mode}'] = timing
+
+        matrix = [r['responses'] for r in records]
+        timing = measure(lambda: compute_quality_indicators(matrix), repeat=args.repeat)
+        timing['profiles_per_second'] = round(len(records) / (timing['median_ms'] / 1000))
+        results[f'{name}/quality_screening'] = timing
+    return results
+
+
+def bench_prompt(args) -> dict:
+    """Prompt assembly size and time in generate_interpretation with a stubbed client."""
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, REPO_ROOT)
+    import app  # bare mode: Streamlit calls are no-ops outside a script run
+
+    app.Anthropic = StubAnthropic
+    # Measure assembly on every call, not interpretation-cache hits
+    app.get_shared_cache = lambda: InProcessCache(max_entries=0)
+    with open(os.path.join(RESEARCH_DIR, 'BFAS_Complete_RAG_Knowledge_Base.md'), 'r', encoding='utf-8') as f:
+        knowledge_base = f.read()
+
+    results = {}
+    for name, profile in load_test_profiles().items():
+        summary = format_profile_summary(
+            calculate_all_scores(profile['responses'], profile.get('age', 30), profile.get('gender'))
+        )
+        StubAnthropic.prompts.clear()
+        timing = measure(lambda: app.generate_interpretation(summary, knowledge_base),
+                         repeat=args.repeat)
+        prompt = StubAnthropic.prompts[-1]
+        report = app.st.session_state.prompt_report
+        timing['prompt_version'] = report['version']
+        timing['prompt_chars'] = len(prompt)
+        timing['approx_prompt_tokens'] = len(prompt) // 4
+        timing['profile_tokens'] = report['section_tokens']['profile']
+        results[name] = timing
+    return results
+
+
+def bench_cold_start(args) -> dict:
+    """Fresh-interpreter import time of app.py and the scoring engine."""
+    targets = {
+        'app': ['-c', 'import app'],
+        'bfas_scoring': ['-c', 'import sys; sys.path.insert(0, "exportedResearch"); import bfas_scoring']
+    }
+    results = {}
+    for name, command in targets.items():
+        def run():
+            subprocess.run([sys.executable, *command], cwd=REPO_ROOT, check=True,
+                           capture_output=True, env={**os.environ, 'DEV_MODE': ''})
+        results[name] = measure(run, repeat=max(3, args.repeat // 2))
+    return results
+
+
+def bench_pages(args) -> dict:
+    """Streamlit rerun cost per page via the app testing harness (offline)."""
+    import anthropic
+    from streamlit.testing.v1 import AppTest
+
+    anthropic.Anthropic = StubAnthropic  # app imports the name at script run
+    os.chdir(REPO_ROOT)
+    app_path = os.path.join(REPO_ROOT, 'app.py')
+    responses = load_test_profiles()['sara_phd']['responses']
+
+    states = {
+        'welcome': {'page': 'welcome'},
+        'demographics': {'page': 'demographics'},
+        'assessment': {'page': 'assessment', 'age': 29, 'gender': 'female',
+                       'responses': {i + 1: responses[i] for i in range(50)},
+                       'adaptive_session': None},
+        'results': {'page': 'results', 'age': 29, 'gender': 'female',
+                    'responses': {i + 1: responses[i] for i in range(100)},
+                    'adaptive_session': None}
+    }
+
+    results = {}
+    for page, state in states.items():
+        at = AppTest.from_file(app_path, default_timeout=60)
+        for key, value in state.items():
+            at.session_state[key] = value
+
+        def rerun():
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{page}: {at.exception[0].message}")
+
+        results[page] = measure(rerun, repeat=args.repeat, warmup=1)
+    return results
+
+
+BENCHMARKS = {
+    'scoring': bench_scoring,
+    'batch': bench_batch,
+    'prompt': bench_prompt,
+    'cold_start': bench_cold_start,
+    'pages': bench_pages
+}
+
+
+# ============================================================================
+# COMPARISON
+# ============================================================================
+
+def compare(old: dict, new: dict) -> list:
+    """Median-latency ratios (new / old) for every benchmark present in both runs."""
+    rows = []
+    for group, entries in new['benchmarks'].items():
+        for name, timing in entries.items():
+            before = old['benchmarks'].get(group, {}).get(name)
+            if not before or 'median_ms' not in before or not before['median_ms']:
+                continue
+            ratio = timing['median_ms'] / before['median_ms']
+            rows.append((f'{group}/{name}', before['median_ms'], timing['median_ms'], ratio))
+    return rows
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='BFAS offline benchmark suite')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='subset to run')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--output', help='result path (default: benchmarks/results/<sha>-<time>.json)')
+    parser.add_argument('--compare', help='earlier result JSON to compare against')
+    args = parser.parse_args()
+
+    # Never reach the network, even if a key is configured
+    os.environ.pop('ANTHROPIC_API_KEY', None)
+    random.seed(SEED)
+
+    run = {
+        'meta': {
+            'git_sha': git_sha(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'batch_size': args.batch_size
+        },
+        'benchmarks': {}
+    }
+
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", file=sys.stderr)
+        run['benchmarks'][name] = BENCHMARKS[name](args)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{run['meta']['git_sha']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+
+    for group, entries in run['benchmarks'].items():
+        for name, timing in entries.items():
+            print(f"{group + '/' + name:45s} median {timing['median_ms']:10.3f} ms")
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            old = json.load(f)
+        print(f"\nCompared with {old['meta']['git_sha']} ({old['meta']['timestamp']}):")
+        for name, before, after, ratio in compare(old, run):
+            marker = '  REGRESSION' if ratio > REGRESSION_THRESHOLD else ''
+            print(f"{name:45s} {before:10.3f} -> {after:10.3f} ms  x{ratio:.2f}{marker}")
+
+
+if __name__ == '__main__':
+    main()
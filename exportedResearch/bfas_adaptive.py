@@ -0,0 +1,441 @@
+"""
+BFAS Adaptive Short Form
+Computerized adaptive administration of the BFAS item bank.
+Each aspect is modelled with a graded response model (GRM); after every answer
+the aspect's posterior over theta is updated on a fixed grid, an aspect stops
+once its posterior SD falls below a threshold, and the next item is the one
+with the highest expected (posterior-weighted) information.
+
+A precise estimate can still sit right on a clinical-flag cut-off or on the
+edge of a within-domain asymmetry, where a few raw points flip what the user
+is shown. Such aspects keep receiving items until the posterior puts the
+percentile clearly on one side, or the aspect is fully administered.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
+import json
+
+import numpy as np
+from scipy.stats import norm
+
+from bfas_scoring import (
+    ASPECT_RANGES, ASPECT_TO_DIMENSION, REVERSE_ITEMS, RAW_SCORE_MIN, RAW_SCORE_MAX,
+    BFASProfile, calculate_scores_from_raw, select_norms
+)
+from bfas_item_analysis import N_ITEMS, N_OPTIONS, ItemStatistics
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+PRIOR = norm.pdf(THETA_GRID) / norm.pdf(THETA_GRID).sum()
+
+# Stop an aspect once the posterior SD of theta is below this
+DEFAULT_SE_THRESHOLD = 0.42
+MIN_ITEMS_PER_ASPECT = 2
+MAX_ITEMS_PER_ASPECT = 10
+
+# Stated agreement with the full form: 90% of aspect percentiles within this
+# many points (benchmarks/bench_adaptive.py checks it at DEFAULT_SE_THRESHOLD)
+PERCENTILE_TOLERANCE = 15
+TOLERANCE_COVERAGE = 0.90
+
+# Percentile cut-offs used by detect_clinical_patterns() and the gap that
+# detect_asymmetries() reports; an aspect stays open while the posterior
+# probability of being on the other side of one is above CUT_OFF_RISK
+FLAG_CUT_OFFS = (25, 40, 75)
+ASYMMETRY_POINTS = 15
+CUT_OFF_RISK = 0.15
+
+# Agreement with the full form on what the user sees; benchmarks/bench_adaptive.py
+# stamps a bank with these and the app only offers banks that passed
+MIN_FLAG_RECALL = 0.90
+MIN_FLAG_PRECISION = 0.90
+MIN_ASYMMETRY_AGREEMENT = 0.90
+
+# Any age from 25 up selects the adult (ESCS) norms when none is given
+DEFAULT_NORM_AGE = 40
+
+# How an adaptive profile's raw totals are obtained (recorded with results)
+ESTIMATION_METHOD = 'grm_eap_expected_raw'
+
+# Logistic scaling constant to match the normal ogive
+LOGISTIC_D = 1.702
+
+# Loadings are clipped so discrimination and thresholds stay finite
+MIN_LOADING = 0.05
+MAX_LOADING = 0.95
+
+_REVERSE_ITEM_IDS = {item for items in REVERSE_ITEMS.values() for item in items}
+
+
+# ============================================================================
+# DATA STRUCTURES
+# ============================================================================
+
+@dataclass
+class ItemParameters:
+    item_id: int
+    aspect: str
+    discrimination: float
+    thresholds: List[float]  # 4 ordered GRM boundaries on the scored (reverse-coded) scale
+    reverse: bool
+
+
+@dataclass
+class ItemBank:
+    """GRM parameters plus category probabilities and information precomputed on THETA_GRID."""
+    parameters: Dict[int, ItemParameters]
+    validation: Optional[Dict] = None  # benchmark summary stamped by bench_adaptive.py
+    category_probs: Dict[int, np.ndarray] = field(default_factory=dict)  # (5, grid) scored categories
+    information: Dict[int, np.ndarray] = field(default_factory=dict)  # (grid,)
+
+    def __post_init__(self):
+        for item_id, params in self.parameters.items():
+            probs, info = grm_curves(params.discrimination, params.thresholds)
+            self.category_probs[item_id] = probs
+            self.information[item_id] = info
+
+    def aspect_items(self, aspect: str) -> List[int]:
+        start, end = ASPECT_RANGES[aspect]
+        return [i for i in range(start, end + 1) if i in self.parameters]
+
+    @property
+    def validated(self) -> bool:
+        """True if the bank was benchmarked against the full form and passed."""
+        return bool(self.validation and self.validation.get('passed'))
+
+
+@dataclass
+class AspectEstimate:
+    aspect: str
+    theta: float
+    se: float
+    items_administered: List[int]
+    expected_raw_score: float
+
+
+# ============================================================================
+# GRADED RESPONSE MODEL
+# ============================================================================
+
+def grm_curves(discrimination: float, thresholds: List[float]) -> tuple:
+    """
+    Category probabilities (5 x grid) and Fisher information (grid) for one item.
+
+    P*(X >= k) = logistic(a * (theta - b_k)) for k = 2..5, and
+    I(theta) = sum_k (P*_k' - P*_{k+1}')^2 / P_k.
+    """
+    a = discrimination
+    b = np.asarray(thresholds)[:, None]
+    cumulative = 1 / (1 + np.exp(-a * (THETA_GRID[None, :] - b)))
+    upper = np.vstack([np.ones_like(THETA_GRID), cumulative])
+    lower = np.vstack([cumulative, np.zeros_like(THETA_GRID)])
+    probs = np.clip(upper - lower, 1e-12, None)
+
+    slope = a * upper * (1 - upper) - a * lower * (1 - lower)
+    information = (slope ** 2 / probs).sum(axis=0)
+    return probs, information
+
+
+def estimate_item_parameters(stats: ItemStatistics) -> Dict[int, ItemParameters]:
+    """
+    Estimate GRM parameters from accumulated item statistics.
+
+    Uses the factor-analytic conversion: each item's loading on its aspect is
+    approximated by its corrected item-total correlation, disattenuated by the
+    aspect's alpha, then a = D * l / sqrt(1 - l^2) and b_k = tau_k / l, where
+    tau_k are the normal thresholds of the cumulative response proportions.
+    """
+    report = stats.report()
+    proportions = stats.counts / stats.n
+    parameters = {}
+
+    for aspect, reliability in report.aspects.items():
+        alpha = reliability.cronbach_alpha
+        scale = np.sqrt(alpha) if alpha and alpha > 0 else 1.0
+        for item_id, item_total in reliability.item_total_correlations.items():
+            loading = float(np.clip(item_total / scale, MIN_LOADING, MAX_LOADING))
+            reverse = item_id in _REVERSE_ITEM_IDS
+            scored = proportions[item_id - 1][::-1] if reverse else proportions[item_id - 1]
+
+            # tau_k = Phi^-1(P(scored < k)), k = 2..5
+            below = np.clip(np.cumsum(scored)[:-1], 1e-3, 1 - 1e-3)
+            thresholds = np.maximum.accumulate(norm.ppf(below) / loading)
+
+            parameters[item_id] = ItemParameters(
+                item_id=item_id,
+                aspect=aspect,
+                discrimination=round(LOGISTIC_D * loading / np.sqrt(1 - loading ** 2), 4),
+                thresholds=[round(float(t), 4) for t in thresholds],
+                reverse=reverse
+            )
+    return parameters
+
+
+def save_item_parameters(parameters: Dict[int, ItemParameters], path: str,
+                         validation: Optional[Dict] = None) -> None:
+    """Write item parameters (and an optional benchmark stamp) to JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'model': 'graded_response',
+            'validation': validation,
+            'items': [
+                {
+                    'id': p.item_id,
+                    'aspect': p.aspect,
+                    'discrimination': p.discrimination,
+                    'thresholds': p.thresholds,
+                    'reverse': p.reverse
+                }
+                for p in sorted(parameters.values(), key=lambda p: p.item_id)
+            ]
+        }, f, indent=2)
+
+
+def validate_item_parameters(items: List[Dict], path: str = '') -> None:
+    """A bank must cover every item id once, in its aspect, with 4 thresholds."""
+    ids = sorted(item['id'] for item in items)
+    expected = list(range(1, N_ITEMS + 1))
+    if ids != expected:
+        missing = sorted(set(expected) - set(ids))
+        raise ValueError(f"{path}: item parameters must cover ids 1-{N_ITEMS} once each"
+                         f"{f'; missing {missing}' if missing else '; duplicates or extra ids'}")
+    for item in items:
+        start, end = ASPECT_RANGES.get(item['aspect'], (0, 0))
+        if not start <= item['id'] <= end:
+            raise ValueError(f"{path}: item {item['id']} is not in aspect {item['aspect']!r}")
+        if len(item['thresholds']) != N_OPTIONS - 1:
+            raise ValueError(f"{path}: item {item['id']} needs {N_OPTIONS - 1} thresholds")
+
+
+def load_item_bank(path: str) -> ItemBank:
+    """Load item parameters written by save_item_parameters."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    validate_item_parameters(data['items'], path)
+    return ItemBank(validation=data.get('validation'), parameters={
+        item['id']: ItemParameters(
+            item_id=item['id'],
+            aspect=item['aspect'],
+            discrimination=item['discrimination'],
+            thresholds=item['thresholds'],
+            reverse=item['reverse']
+        )
+        for item in data['items']
+    })
+
+
+# ============================================================================
+# ADAPTIVE SESSION
+# ============================================================================
+
+class AdaptiveSession:
+    """
+    State of one adaptive administration.
+
+    Call next_item() for the item to present, record(item_id, response) with
+    the raw 1-5 answer, and to_profile() once finished() is True.
+
+    Cut-offs are judged against the norms the profile will be scored on, so
+    pass the respondent's age and gender; without an age the adult (ESCS)
+    norms are used.
+    """
+
+    def __init__(
+        self,
+        bank: ItemBank,
+        se_threshold: float = DEFAULT_SE_THRESHOLD,
+        min_items: int = MIN_ITEMS_PER_ASPECT,
+        max_items: int = MAX_ITEMS_PER_ASPECT,
+        age: Optional[int] = None,
+        gender: Optional[str] = None,
+        cut_off_risk: float = CUT_OFF_RISK
+    ):
+        self.bank = bank
+        self.se_threshold = se_threshold
+        self.min_items = min_items
+        self.max_items = max_items
+        self.cut_off_risk = cut_off_risk
+        self.norms, _ = select_norms(DEFAULT_NORM_AGE if age is None else age, gender)
+        self.posteriors = {aspect: PRIOR.copy() for aspect in ASPECT_RANGES}
+        self.responses: Dict[int, int] = {}
+        self._predicted: Dict[str, np.ndarray] = {}  # per aspect, until its next answer
+
+    def _administered(self, aspect: str) -> List[int]:
+        start, end = ASPECT_RANGES[aspect]
+        return [i for i in self.responses if start <= i <= end]
+
+    def _capped(self, aspect: str) -> bool:
+        n = len(self._administered(aspect))
+        return n >= min(self.max_items, len(self.bank.aspect_items(aspect)))
+
+    def aspect_done(self, aspect: str) -> bool:
+        if self._capped(aspect):
+            return True
+        if len(self._administered(aspect)) < self.min_items or self.posterior_sd(aspect) >= self.se_threshold:
+            return False
+        if self._cut_off_uncertain(aspect):
+            return False
+        partner = next(a for a in ASPECT_RANGES
+                       if a != aspect and ASPECT_TO_DIMENSION[a] == ASPECT_TO_DIMENSION[aspect])
+        return not self._asymmetry_uncertain(aspect, partner)
+
+    def predicted_raw_distribution(self, aspect: str) -> np.ndarray:
+        """
+        Posterior predictive distribution of the full-form raw total (10-50):
+        answered items are fixed, unanswered ones are convolved at each theta
+        and the result is weighted by the aspect posterior.
+        """
+        if aspect in self._predicted:
+            return self._predicted[aspect]
+        start, end = ASPECT_RANGES[aspect]
+        n_totals = RAW_SCORE_MAX - RAW_SCORE_MIN + 1
+        given = 0
+        by_theta = np.zeros((len(THETA_GRID), n_totals))
+        by_theta[:, 0] = 1.0
+        width = 1
+        for item_id in range(start, end + 1):
+            if item_id in self.responses:
+                response = self.responses[item_id]
+                given += (6 - response if item_id in _REVERSE_ITEM_IDS else response) - 1
+                continue
+            probs = self.bank.category_probs[item_id]
+            convolved = np.zeros_like(by_theta)
+            for k in range(N_OPTIONS):
+                convolved[:, k:k + width] += probs[k][:, None] * by_theta[:, :width]
+            by_theta = convolved
+            width += N_OPTIONS - 1
+        distribution = np.zeros(n_totals)
+        distribution[given:given + width] = self.posteriors[aspect] @ by_theta[:, :width]
+        self._predicted[aspect] = distribution
+        return distribution
+
+    def _percentile_distribution(self, aspect: str) -> tuple:
+        """(percentiles, probabilities) of the full-form score under the session norms."""
+        raw = np.arange(RAW_SCORE_MIN, RAW_SCORE_MAX + 1)
+        params = self.norms[aspect]
+        percentiles = np.round(norm.cdf((raw / 10 - params['mean']) / params['sd']) * 100)
+        return percentiles, self.predicted_raw_distribution(aspect)
+
+    def _cut_off_uncertain(self, aspect: str) -> bool:
+        percentiles, probs = self._percentile_distribution(aspect)
+        for cut in FLAG_CUT_OFFS:
+            above = float(probs[percentiles >= cut].sum())
+            if self.cut_off_risk < above < 1 - self.cut_off_risk:
+                return True
+        return False
+
+    def _asymmetry_uncertain(self, aspect: str, partner: str) -> bool:
+        """Whether the pair's gap could fall either side of ASYMMETRY_POINTS."""
+        pct_a, probs_a = self._percentile_distribution(aspect)
+        pct_b, probs_b = self._percentile_distribution(partner)
+        gap = pct_a[:, None] - pct_b[None, :]
+        joint = probs_a[:, None] * probs_b[None, :]
+        for side in (gap >= ASYMMETRY_POINTS, gap <= -ASYMMETRY_POINTS):
+            p = float(joint[side].sum())
+            if self.cut_off_risk < p < 1 - self.cut_off_risk:
+                return True
+        return False
+
+    def finished(self) -> bool:
+        return all(self.aspect_done(aspect) for aspect in ASPECT_RANGES)
+
+    def posterior_mean(self, aspect: str) -> float:
+        return float(self.posteriors[aspect] @ THETA_GRID)
+
+    def posterior_sd(self, aspect: str) -> float:
+        mean = self.posterior_mean(aspect)
+        return float(np.sqrt(self.posteriors[aspect] @ (THETA_GRID - mean) ** 2))
+
+    def next_item(self) -> Optional[int]:
+        """Most informative unanswered item in the least precisely measured open aspect."""
+        open_aspects = [a for a in ASPECT_RANGES if not self.aspect_done(a)]
+        if not open_aspects:
+            return None
+        aspect = max(open_aspects, key=self.posterior_sd)
+        posterior = self.posteriors[aspect]
+        candidates = [i for i in self.bank.aspect_items(aspect) if i not in self.responses]
+        return max(candidates, key=lambda i: float(posterior @ self.bank.information[i]))
+
+    def record(self, item_id: int, response: int) -> None:
+        """Update the aspect posterior with a raw 1-5 answer."""
+        if not 1 <= response <= 5:
+            raise ValueError(f"Item {item_id}: response {response} out of range [1-5]")
+        params = self.bank.parameters[item_id]
+        scored = 6 - response if params.reverse else response
+        posterior = self.posteriors[params.aspect] * self.bank.category_probs[item_id][scored - 1]
+        self.posteriors[params.aspect] = posterior / posterior.sum()
+        self.responses[item_id] = response
+        self._predicted.pop(params.aspect, None)
+
+    def estimates(self) -> Dict[str, AspectEstimate]:
+        """
+        Per-aspect theta, SE and expected raw total. Answered items count as
+        given; unanswered items contribute their posterior expected score.
+        """
+        estimates = {}
+        categories = np.arange(1, 6)
+        for aspect in ASPECT_RANGES:
+            start, end = ASPECT_RANGES[aspect]
+            posterior = self.posteriors[aspect]
+            total = 0.0
+            for item_id in range(start, end + 1):
+                if item_id in self.responses:
+                    response = self.responses[item_id]
+                    total += 6 - response if item_id in _REVERSE_ITEM_IDS else response
+                else:
+                    total += float(categories @ self.bank.category_probs[item_id] @ posterior)
+            estimates[aspect] = AspectEstimate(
+                aspect=aspect,
+                theta=round(self.posterior_mean(aspect), 3),
+                se=round(self.posterior_sd(aspect), 3),
+                items_administered=self._administered(aspect),
+                expected_raw_score=round(total, 2)
+            )
+        return estimates
+
+    def to_profile(self, age: int, gender: Optional[str] = None,
+                   scoring_mode: str = 'normal') -> BFASProfile:
+        """Score the session through the standard norm pipeline."""
+        raw_scores = {
+            aspect: int(np.clip(round(estimate.expected_raw_score), RAW_SCORE_MIN, RAW_SCORE_MAX))
+            for aspect, estimate in self.estimates().items()
+        }
+        return calculate_scores_from_raw(raw_scores, age, gender, scoring_mode)
+
+
+def simulate_session(bank: ItemBank, responses: List[int], **kwargs) -> AdaptiveSession:
+    """Replay a stored 100-item response vector through an adaptive session."""
+    session = AdaptiveSession(bank, **kwargs)
+    item_id = session.next_item()
+    while item_id is not None:
+        session.record(item_id, responses[item_id - 1])
+        item_id = session.next_item()
+    return session
+
+
+# ============================================================================
+# CALIBRATION
+# ============================================================================
+
+if __name__ == '__main__':
+    # Calibrate from stored responses:
+    #   python bfas_adaptive.py responses.csv bfas_item_parameters.json
+    # then benchmark and stamp the bank before the app will offer it:
+    #   python benchmarks/bench_adaptive.py --parameters bfas_item_parameters.json \
+    #       --stamp bfas_item_parameters.json
+    import sys
+    from bfas_item_analysis import iter_csv_chunks
+
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python bfas_adaptive.py <responses.csv> <parameters.json>")
+
+    stats = ItemStatistics()
+    for chunk in iter_csv_chunks(sys.argv[1]):
+        stats.update(chunk)
+    save_item_parameters(estimate_item_parameters(stats), sys.argv[2])
+    print(f"Calibrated {len(ASPECT_RANGES) * 10} items on {stats.n} respondents -> {sys.argv[2]}")
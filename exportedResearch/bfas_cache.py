@@ -0,0 +1,213 @@
+"""
+BFAS Shared Cache
+Pluggable key-value cache for results that are expensive to recompute and
+identical across sessions, above all the LLM interpretation of a prompt.
+
+- InProcessCache: bounded LRU dict, private to one process (default)
+- SQLiteCache: one WAL-mode SQLite file shared by every replica on a host;
+  put it on /dev/shm for a memory-backed store
+
+Values must be JSON-serializable. Entries expire after a TTL so nothing is
+kept longer than the session store keeps in-progress answers.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+CACHE_BACKENDS = ('memory', 'sqlite')
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Bound for the in-process LRU; interpretations are a few KB each
+DEFAULT_MAX_ENTRIES = 2048
+
+# How often SQLiteCache sweeps expired rows (on the next write after this)
+PURGE_INTERVAL = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+def cache_key(*parts: str) -> str:
+    """Stable digest of the inputs that determine a cached value."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class CacheBackend(ABC):
+    """get/set/delete by (namespace, key); get returns None on a miss or expiry."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        ...
+
+    def _expiry(self, ttl_seconds: Optional[float]) -> float:
+        return time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+
+
+class InProcessCache(CacheBackend):
+    """Thread-safe LRU held in this process only."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[(namespace, key)]
+                return None
+            self._entries.move_to_end((namespace, key))
+            return entry[0]
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[(namespace, key)] = (value, self._expiry(ttl_seconds))
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache in a SQLite file that several processes open concurrently.
+    WAL lets readers proceed while one replica writes; each thread keeps
+    its own connection.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(SCHEMA)
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            'SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at >= ?',
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, '
+                'expires_at = excluded.expires_at',
+                (namespace, key, json.dumps(value), self._expiry(ttl_seconds))
+            )
+            if now - self._last_purge >= PURGE_INTERVAL:
+                conn.execute('DELETE FROM cache WHERE expires_at < ?', (now,))
+                self._last_purge = now
+
+    def delete(self, namespace: str, key: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, key))
+
+
+def create_cache(backend: str = 'memory', path: Optional[str] = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS) -> CacheBackend:
+    """Build the configured backend ('memory' or 'sqlite')."""
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Cache backend must be one of {CACHE_BACKENDS}, got {backend!r}")
+    if backend == 'sqlite':
+        if not path:
+            raise ValueError("The sqlite cache backend needs a path")
+        return SQLiteCache(path, ttl_seconds)
+    return InProcessCache(ttl_seconds)
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+def _replica_worker(path: str) -> float:
+    """One simulated replica: 200 lookups over 50 shared keys, us per lookup."""
+    cache = SQLiteCache(path)
+    value = {'text': 'x' * 6000}
+    start = time.perf_counter()
+    for j in range(200):
+        key = cache_key('interpretation', str(j % 50))
+        if cache.get('interpretation', key) is None:
+            cache.set('interpretation', key, value)
+    return (time.perf_counter() - start) / 200 * 1e6
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+    value = {'text': 'x' * 6000}
+    SQLiteCache(path)  # create the schema before the replicas race
+
+    with ProcessPoolExecutor(4) as pool:
+        per_op = list(pool.map(_replica_worker, [path] * 4))
+    print(f"SQLiteCache, 4 processes sharing 50 keys: {', '.join(f'{t:.0f}' for t in per_op)} us/lookup")
+
+    memory = InProcessCache()
+    start = time.perf_counter()
+    for j in range(100000):
+        memory.get('interpretation', str(j % 50)) or memory.set('interpretation', str(j % 50), value)
+    print(f"InProcessCache: {(time.perf_counter() - start) / 100000 * 1e6:.2f} us/lookup")
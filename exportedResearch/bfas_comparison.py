@@ -0,0 +1,298 @@
+"""
+BFAS Profile Comparison
+Longitudinal (same person over time) and multi-rater (self vs. observers)
+comparison of scored profiles.
+
+- Aspect deltas and the Jacobson-Truax reliable change index (RCI)
+- Self/other agreement: per-aspect gaps and profile correlation, with
+  observer raw totals re-normed against the subject's age and gender
+- ProfileSeries keeps only aspect vectors and running observer sums, so each
+  new measurement is an O(10) update with no re-scoring of history
+- Array functions accept (..., 10) inputs and run over whole rosters at once
+
+Profiles may be BFASProfile objects or format_profile_summary() dicts
+(including the 'scores' block of a downloaded results file). Downloads of an
+adaptive session are marked as estimated, and reports say when they include one.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+
+from bfas_scoring import ASPECT_RANGES, ESCS_NORMS, BFASProfile, calculate_scores_from_raw
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+ASPECTS = list(ASPECT_RANGES)
+
+# Internal consistency per aspect (Cronbach's alpha, approximate values from
+# DeYoung et al. 2007). Sample estimates from bfas_item_analysis can replace
+# these via reliability_from_report().
+ASPECT_RELIABILITY = {
+    'openness': 0.78,
+    'intellect': 0.84,
+    'industriousness': 0.83,
+    'orderliness': 0.81,
+    'enthusiasm': 0.83,
+    'assertiveness': 0.86,
+    'compassion': 0.85,
+    'politeness': 0.76,
+    'withdrawal': 0.82,
+    'volatility': 0.88
+}
+
+# |RCI| above this is a reliable change at p < .05 (two-tailed)
+RCI_CRITICAL = 1.96
+
+# Self-other z-score gap worth pointing out (half a population SD)
+AGREEMENT_GAP_Z = 0.5
+
+# Raw aspect totals are 10 items; the reference SD is the ESCS community SD
+RAW_SD = np.array([ESCS_NORMS[a]['sd'] * 10 for a in ASPECTS])
+
+ProfileLike = Union[BFASProfile, Dict]
+
+
+@dataclass
+class AspectVectors:
+    """One measurement as aligned (10,) arrays in ASPECTS order."""
+    label: str
+    raw: np.ndarray
+    z: np.ndarray
+    percentile: np.ndarray
+    estimated: bool = False  # adaptive short form: raw totals are model estimates
+
+
+@dataclass
+class ChangeReport:
+    from_label: str
+    to_label: str
+    delta_raw: Dict[str, int]
+    delta_percentile: Dict[str, int]
+    rci: Dict[str, float]
+    reliable_changes: Dict[str, str]  # aspect -> 'increase' / 'decrease'
+    estimated: bool = False  # either time point is an adaptive estimate
+
+
+@dataclass
+class AgreementReport:
+    self_label: str
+    n_observers: int
+    observer_percentile: Dict[str, int]  # mean over observers
+    self_minus_other_z: Dict[str, float]
+    profile_correlation: Optional[float]  # Pearson r over the 10 aspect z-scores
+    mean_abs_difference_z: float
+    gaps: List[str] = field(default_factory=list)  # aspects with |gap| >= AGREEMENT_GAP_Z, largest first
+    estimated: bool = False  # self-report or any observer rating is an adaptive estimate
+
+
+# ============================================================================
+# VECTORIZED CORE
+# ============================================================================
+
+def aspect_vectors(profile: ProfileLike, label: str = '') -> AspectVectors:
+    """Extract aligned raw / z / percentile arrays from a profile or summary dict."""
+    estimated = False
+    if isinstance(profile, BFASProfile):
+        scores = {a: (s.raw_score, s.z_score, s.percentile) for a, s in profile.aspect_scores.items()}
+    else:
+        estimated = (profile.get('administration') or {}).get('method') == 'adaptive'
+        summary = profile.get('scores', profile)
+        scores = {a: (s['raw_score'], s['z_score'], s['percentile'])
+                  for a, s in summary['aspect_scores'].items()}
+    missing = [a for a in ASPECTS if a not in scores]
+    if missing:
+        raise ValueError(f"Profile is missing aspects: {missing}")
+    raw, z, pct = (np.array(col, dtype=float) for col in zip(*(scores[a] for a in ASPECTS)))
+    return AspectVectors(label=label, raw=raw, z=z, percentile=pct, estimated=estimated)
+
+
+def roster_matrix(profiles: Sequence[ProfileLike], kind: str = 'raw') -> np.ndarray:
+    """Stack profiles into an (n, 10) array of 'raw', 'z' or 'percentile' scores."""
+    return np.stack([getattr(aspect_vectors(p), kind) for p in profiles])
+
+
+def reliability_from_report(report) -> Dict[str, float]:
+    """Aspect alphas from a bfas_item_analysis ItemAnalysisReport."""
+    return {a: rel.cronbach_alpha for a, rel in report.aspects.items()}
+
+
+def difference_standard_error(reliability: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """S_diff = sqrt(2) * SEM, SEM = SD * sqrt(1 - r), on the raw-total scale."""
+    reliability = reliability or ASPECT_RELIABILITY
+    r = np.array([reliability[a] for a in ASPECTS])
+    return np.sqrt(2.0) * RAW_SD * np.sqrt(1.0 - r)
+
+
+def reliable_change(before_raw: np.ndarray, after_raw: np.ndarray,
+                    reliability: Optional[Dict[str, float]] = None) -> tuple:
+    """
+    Raw deltas and RCIs for (..., 10) arrays, e.g. whole rosters at two time
+    points. Raw totals are used (not z-scores) so a change of norm set or age
+    band between measurements does not register as change.
+    """
+    delta = np.asarray(after_raw, dtype=float) - np.asarray(before_raw, dtype=float)
+    return delta, delta / difference_standard_error(reliability)
+
+
+def self_other_agreement(self_z: np.ndarray, other_z: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Agreement between self and (mean) observer z-scores, both (..., 10).
+    Returns per-aspect gaps, profile correlation and mean absolute gap.
+    """
+    self_z = np.asarray(self_z, dtype=float)
+    other_z = np.asarray(other_z, dtype=float)
+    gap = self_z - other_z
+
+    a = self_z - self_z.mean(axis=-1, keepdims=True)
+    b = other_z - other_z.mean(axis=-1, keepdims=True)
+    denom = np.sqrt((a * a).sum(axis=-1) * (b * b).sum(axis=-1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = np.where(denom > 0, (a * b).sum(axis=-1) / denom, np.nan)
+
+    return {'gap': gap, 'profile_correlation': r, 'mean_abs_gap': np.abs(gap).mean(axis=-1)}
+
+
+# ============================================================================
+# INCREMENTAL SERIES
+# ============================================================================
+
+class ProfileSeries:
+    """
+    All measurements of one subject. Self-reports form the time series;
+    observer ratings are pooled as running sums. Adding a measurement only
+    touches its own vectors, the previous time point and the sums.
+    """
+
+    def __init__(self, subject_id: str = '', reliability: Optional[Dict[str, float]] = None,
+                 subject_age: Optional[int] = None, subject_gender: Optional[str] = None,
+                 scoring_mode: str = 'normal'):
+        self.subject_id = subject_id
+        self.subject_age = subject_age
+        self.subject_gender = subject_gender
+        self.scoring_mode = scoring_mode
+        self.reliability = reliability or ASPECT_RELIABILITY
+        self._s_diff = difference_standard_error(self.reliability)
+        self.time_points: List[AspectVectors] = []
+        self.changes: List[ChangeReport] = []  # consecutive time points
+        self._observer_labels: List[str] = []
+        self._observer_estimated = False
+        self._observer_z_sum = np.zeros(len(ASPECTS))
+        self._observer_pct_sum = np.zeros(len(ASPECTS))
+
+    # -- adding measurements -------------------------------------------------
+
+    def add_self(self, profile: ProfileLike, label: Optional[str] = None) -> Optional[ChangeReport]:
+        """Append a self-report time point; returns the change from the previous one."""
+        vectors = aspect_vectors(profile, label or f'T{len(self.time_points) + 1}')
+        self.time_points.append(vectors)
+        if len(self.time_points) == 1:
+            return None
+        change = self._change(self.time_points[-2], vectors)
+        self.changes.append(change)
+        return change
+
+    def add_observer(self, profile: ProfileLike, label: Optional[str] = None) -> None:
+        """
+        Pool an observer rating of the subject. A downloaded rating is normed on
+        the rater's own age and gender; with subject_age set, its raw totals are
+        re-scored against the subject's norms so the gaps compare like with like.
+        """
+        vectors = aspect_vectors(profile, label or f'Observer {len(self._observer_labels) + 1}')
+        if self.subject_age is not None:
+            raw = {a: int(value) for a, value in zip(ASPECTS, vectors.raw)}
+            renormed = calculate_scores_from_raw(raw, self.subject_age, self.subject_gender, self.scoring_mode)
+            estimated = vectors.estimated
+            vectors = aspect_vectors(renormed, vectors.label)
+            vectors.estimated = estimated
+        self._observer_labels.append(vectors.label)
+        self._observer_estimated = self._observer_estimated or vectors.estimated
+        self._observer_z_sum += vectors.z
+        self._observer_pct_sum += vectors.percentile
+
+    # -- reports -------------------------------------------------------------
+
+    @property
+    def n_observers(self) -> int:
+        return len(self._observer_labels)
+
+    def change_from_baseline(self) -> Optional[ChangeReport]:
+        if len(self.time_points) < 2:
+            return None
+        return self._change(self.time_points[0], self.time_points[-1])
+
+    def agreement(self) -> Optional[AgreementReport]:
+        """Latest self-report against the mean of all observers so far."""
+        if not self.time_points or not self.n_observers:
+            return None
+        latest = self.time_points[-1]
+        other_z = self._observer_z_sum / self.n_observers
+        result = self_other_agreement(latest.z, other_z)
+        gap = result['gap']
+        r = float(result['profile_correlation'])
+        observer_pct = np.rint(self._observer_pct_sum / self.n_observers).astype(int)
+        return AgreementReport(
+            self_label=latest.label,
+            n_observers=self.n_observers,
+            observer_percentile=dict(zip(ASPECTS, observer_pct.tolist())),
+            self_minus_other_z=dict(zip(ASPECTS, np.round(gap, 2).tolist())),
+            profile_correlation=None if np.isnan(r) else round(r, 3),
+            mean_abs_difference_z=round(float(result['mean_abs_gap']), 3),
+            gaps=[ASPECTS[i] for i in np.argsort(-np.abs(gap)) if abs(gap[i]) >= AGREEMENT_GAP_Z],
+            estimated=latest.estimated or self._observer_estimated
+        )
+
+    def _change(self, before: AspectVectors, after: AspectVectors) -> ChangeReport:
+        delta = after.raw - before.raw
+        rci = delta / self._s_diff
+        return ChangeReport(
+            from_label=before.label,
+            to_label=after.label,
+            delta_raw=dict(zip(ASPECTS, delta.astype(int).tolist())),
+            delta_percentile=dict(zip(ASPECTS, (after.percentile - before.percentile).astype(int).tolist())),
+            rci=dict(zip(ASPECTS, np.round(rci, 2).tolist())),
+            reliable_changes={
+                a: 'increase' if value > 0 else 'decrease'
+                for a, value in zip(ASPECTS, rci) if abs(value) >= RCI_CRITICAL
+            },
+            estimated=before.estimated or after.estimated
+        )
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == '__main__':
+    import json
+    import os
+    import time
+    from bfas_scoring import calculate_all_scores
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'test_profiles.json'), 'r') as f:
+        profiles = json.load(f)
+
+    print(f"Reliable change needs |raw delta| >= "
+          f"{dict(zip(ASPECTS, np.ceil(RCI_CRITICAL * difference_standard_error()).astype(int).tolist()))}")
+
+    series = ProfileSeries('demo', subject_age=29, subject_gender='female')
+    series.add_self(calculate_all_scores(profiles['sara_phd']['responses'], 29, 'female'), 'baseline')
+    change = series.add_self(calculate_all_scores(profiles['warm_teacher']['responses'], 29, 'female'), '6 months')
+    print(f"Reliable changes {change.from_label} -> {change.to_label}: {change.reliable_changes}")
+    series.add_observer(calculate_all_scores(profiles['balanced_average']['responses'], 55, 'male'))
+    print(series.agreement())
+
+    # Roster: 100k subjects, two time points
+    rng = np.random.default_rng(0)
+    before = rng.integers(10, 51, size=(100_000, 10))
+    after = np.clip(before + rng.integers(-6, 7, size=before.shape), 10, 50)
+    start = time.perf_counter()
+    delta, rci = reliable_change(before, after)
+    agreement = self_other_agreement(before / 10.0, after / 10.0)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Roster of {len(before)}: {elapsed:.1f} ms, "
+          f"{(np.abs(rci) >= RCI_CRITICAL).any(axis=1).mean():.1%} with any reliable change")
@@ -0,0 +1,503 @@
+"""
+BFAS Golden Corpus and Equivalence Harness
+Regression safety net for alternative scoring engines (vectorized, lookup
+table, parallel). A generated golden corpus pins the reference outputs for
+every norm set, gender branch, age boundary, per-aspect raw total and clinical
+flag; the equivalence harness runs a candidate scorer against the reference
+over millions of random response vectors and reports any mismatch.
+
+Usage:
+    python bfas_golden.py generate            # rewrite bfas_golden_corpus.json
+    python bfas_golden.py check               # current engine vs. corpus
+    python bfas_golden.py equivalence --candidate module:function [-n 1000000]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+import importlib
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from bfas_scoring import (
+    ASPECT_RANGES, REVERSE_ITEMS, RAW_SCORE_MIN, RAW_SCORE_MAX, SCORING_MODES,
+    BFASProfile, calculate_all_scores, calculate_batch_scores,
+    detect_asymmetries, detect_clinical_patterns, is_female
+)
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'bfas_golden_corpus.json')
+TEST_PROFILES_PATH = os.path.join(os.path.dirname(__file__), 'test_profiles.json')
+
+ASPECTS = list(ASPECT_RANGES)
+
+# Representative demographics per norm branch (norm set x female adjustment)
+BRANCHES = {
+    ('University', False): (20, None),
+    ('University', True): (20, 'female'),
+    ('ESCS', False): (30, None),
+    ('ESCS', True): (30, 'female'),
+}
+
+GENDER_VARIANTS = [None, 'male', 'female', 'man', 'woman', 'kvinna', 'kvinnlig', 'manlig', 'Female', 'MALE']
+AGE_BOUNDARIES = [17, 24, 25, 26, 100]
+
+# Aspects set to the top (50) or bottom (10) raw total to trip each flag
+FLAG_TRIGGERS = {
+    'max_dysregulation': {'volatility': 50, 'withdrawal': 50},
+    'aggression_risk': {'volatility': 50, 'politeness': 10, 'compassion': 10},
+    'depression_suicide_risk': {'withdrawal': 50, 'enthusiasm': 10, 'assertiveness': 10},
+    'impulsive_selfharm': {'industriousness': 10, 'orderliness': 10, 'volatility': 50},
+    'psychosis_proneness': {'openness': 50, 'intellect': 10, 'volatility': 50},
+    'hypomania_risk': {'assertiveness': 50, 'volatility': 50, 'withdrawal': 10},
+    'perfectionism_paralysis': {'orderliness': 50, 'industriousness': 10},
+}
+
+N_RANDOM_CASES = 50
+SEED = 2024
+
+_REVERSE_MASK = np.zeros(100, dtype=bool)
+for _items in REVERSE_ITEMS.values():
+    _REVERSE_MASK[[i - 1 for i in _items]] = True
+
+
+# ============================================================================
+# CASE CONSTRUCTION
+# ============================================================================
+
+def responses_for_raw(raw_scores: Dict[str, int], default: int = 30) -> List[int]:
+    """Build a 100-item response vector that produces the given raw aspect totals."""
+    responses = []
+    for aspect, (start, end) in ASPECT_RANGES.items():
+        raw = raw_scores.get(aspect, default)
+        base, extra = divmod(raw, 10)
+        # Scored values: `extra` items at base+1, the rest at base
+        scored = [base + 1] * extra + [base] * (10 - extra) if raw < 50 else [5] * 10
+        for item_id, value in zip(range(start, end + 1), scored):
+            responses.append(6 - value if item_id in REVERSE_ITEMS[aspect] else value)
+    return responses
+
+
+def generate_cases() -> List[Dict]:
+    """Deterministic input cases covering every branch, boundary and flag."""
+    cases = []
+
+    # Every raw total for every aspect, per norm branch
+    for (norm_set, female), (age, gender) in BRANCHES.items():
+        for raw in range(RAW_SCORE_MIN, RAW_SCORE_MAX + 1):
+            cases.append({
+                'id': f'sweep/{norm_set}/{"female" if female else "other"}/{raw}',
+                'responses': responses_for_raw({a: raw for a in ASPECTS}),
+                'age': age,
+                'gender': gender
+            })
+
+    # Each clinical flag, per norm branch
+    for pattern, raw_scores in FLAG_TRIGGERS.items():
+        for (norm_set, female), (age, gender) in BRANCHES.items():
+            cases.append({
+                'id': f'flag/{pattern}/{norm_set}/{"female" if female else "other"}',
+                'responses': responses_for_raw(raw_scores),
+                'age': age,
+                'gender': gender
+            })
+
+    with open(TEST_PROFILES_PATH, 'r') as f:
+        test_profiles = json.load(f)
+    sara = test_profiles['sara_phd']['responses']
+
+    for age in AGE_BOUNDARIES:
+        for gender in (None, 'female'):
+            cases.append({'id': f'age/{age}/{gender}', 'responses': sara, 'age': age, 'gender': gender})
+
+    for gender in GENDER_VARIANTS:
+        cases.append({'id': f'gender/{gender}', 'responses': sara, 'age': 30, 'gender': gender})
+
+    for name, profile in test_profiles.items():
+        cases.append({
+            'id': f'profile/{name}',
+            'responses': profile['responses'],
+            'age': profile.get('age', 30),
+            'gender': profile.get('gender')
+        })
+
+    cases.append({'id': 'edge/all_1s', 'responses': [1] * 100, 'age': 30, 'gender': None})
+    cases.append({'id': 'edge/all_5s', 'responses': [5] * 100, 'age': 30, 'gender': None})
+
+    rng = random.Random(SEED)
+    for i in range(N_RANDOM_CASES):
+        cases.append({
+            'id': f'random/{i}',
+            'responses': [rng.randint(1, 5) for _ in range(100)],
+            'age': rng.choice(AGE_BOUNDARIES + [rng.randint(17, 100)]),
+            'gender': rng.choice(GENDER_VARIANTS)
+        })
+    return cases
+
+
+# ============================================================================
+# COMPARISON
+# ============================================================================
+
+def profile_fingerprint(profile: BFASProfile) -> Dict:
+    """The parts of a profile an optimized engine must reproduce exactly."""
+    return {
+        'norm_set': profile.norm_set,
+        'raw': [profile.aspect_scores[a].raw_score for a in ASPECTS],
+        'percentiles': [profile.aspect_scores[a].percentile for a in ASPECTS],
+        'z': [round(profile.aspect_scores[a].z_score, 4) for a in ASPECTS],
+        'gender_adjusted': [a for a in ASPECTS if profile.aspect_scores[a].gender_adjusted],
+        'dimension_scores': profile.dimension_scores,
+        'asymmetries': [[x.domain, x.higher_aspect, x.percentile_diff] for x in profile.asymmetries],
+        'flags': [flag.pattern for flag in profile.clinical_flags]
+    }
+
+
+def diff_fingerprints(expected: Dict, actual: Dict) -> List[str]:
+    """Names of fields that differ (per-aspect for percentiles)."""
+    fields = []
+    for key, value in expected.items():
+        if key == 'percentiles':
+            fields.extend(
+                f'percentile.{aspect}'
+                for aspect, e, a in zip(ASPECTS, value, actual.get(key, []))
+                if e != a
+            )
+        elif actual.get(key) != value:
+            fields.append(key)
+    return fields
+
+
+def generate_corpus(path: str = CORPUS_PATH) -> int:
+    """Score every case in every mode with the reference engine and write the corpus."""
+    entries = []
+    for case in generate_cases():
+        entries.append({
+            **case,
+            'expected': {
+                mode: profile_fingerprint(calculate_all_scores(
+                    case['responses'], case['age'], case['gender'], scoring_mode=mode
+                ))
+                for mode in SCORING_MODES
+            }
+        })
+
+    covered = {flag for e in entries for out in e['expected'].values() for flag in out['flags']}
+    missing = set(FLAG_TRIGGERS) - covered
+    if missing:
+        raise RuntimeError(f"Corpus does not trigger flags: {sorted(missing)}")
+
+    # One case per line keeps diffs of the corpus reviewable
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n' + ',\n'.join(json.dumps(e, separators=(',', ':')) for e in entries) + '\n]\n')
+    return len(entries)
+
+
+def check_corpus(scorer: Callable = calculate_batch_scores, path: str = CORPUS_PATH) -> Dict[str, List[str]]:
+    """
+    Run a batch scorer over the golden corpus.
+
+    Args:
+        scorer: Callable(records, scoring_mode=...) -> List[BFASProfile]
+        path: Corpus file
+
+    Returns:
+        Case id (with mode) -> mismatching fields; empty if identical
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    failures = {}
+    for mode in SCORING_MODES:
+        profiles = scorer(entries, scoring_mode=mode)
+        for entry, profile in zip(entries, profiles):
+            fields = diff_fingerprints(entry['expected'][mode], profile_fingerprint(profile))
+            if fields:
+                failures[f"{entry['id']} [{mode}]"] = fields
+    return failures
+
+
+# ============================================================================
+# EQUIVALENCE HARNESS
+# ============================================================================
+
+@dataclass
+class Mismatch:
+    fields: List[str]
+    record: Dict  # shrunk to a minimal failing input where possible
+    expected: Dict
+    actual: Dict
+
+
+@dataclass
+class EquivalenceReport:
+    scoring_mode: str
+    n_checked: int
+    n_mismatched: int
+    mismatches_by_field: Dict[str, int]
+    examples: List[Mismatch]
+    reference_self_check: int  # rows where the fast reference disagreed with calculate_all_scores
+    elapsed_seconds: float
+
+    @property
+    def equivalent(self) -> bool:
+        return self.n_mismatched == 0 and self.reference_self_check == 0
+
+
+@dataclass
+class _Percentiles:
+    percentile: int
+
+
+@lru_cache(maxsize=None)
+def reference_tables(scoring_mode: str) -> Dict[Tuple[str, bool], np.ndarray]:
+    """
+    Percentile per (branch, aspect, raw total), taken from calculate_all_scores.
+
+    Aspect percentiles depend only on the norm branch and the aspect's raw
+    total, so 41 reference calls per branch pin every value exactly.
+    """
+    tables = {}
+    for branch, (age, gender) in BRANCHES.items():
+        table = np.zeros((len(ASPECTS), RAW_SCORE_MAX + 1), dtype=np.int64)
+        for raw in range(RAW_SCORE_MIN, RAW_SCORE_MAX + 1):
+            profile = calculate_all_scores(responses_for_raw({a: raw for a in ASPECTS}),
+                                           age, gender, scoring_mode=scoring_mode)
+            for i, aspect in enumerate(ASPECTS):
+                table[i, raw] = profile.aspect_scores[aspect].percentile
+        tables[branch] = table
+    return tables
+
+
+def random_records(n: int, seed: int) -> List[Dict]:
+    """
+    Random protocols mixing uniform answers, extreme answers and per-aspect
+    straight-lining (which drives aspects to the tails and trips flags).
+    """
+    rng = np.random.default_rng(seed)
+    uniform = rng.integers(1, 6, size=(n, 100))
+    extreme = np.where(rng.random((n, 100)) < 0.5, 1, 5)
+    blocks = np.repeat(rng.integers(1, 6, size=(n, 10)), 10, axis=1)
+    blocks = np.where(_REVERSE_MASK & (rng.random((n, 100)) < 0.8), 6 - blocks, blocks)
+
+    strategy = rng.integers(0, 3, size=n)[:, None]
+    matrix = np.where(strategy == 0, uniform, np.where(strategy == 1, extreme, blocks))
+
+    ages = rng.choice(AGE_BOUNDARIES + list(range(17, 101)), size=n)
+    genders = rng.integers(0, len(GENDER_VARIANTS), size=n)
+    return [
+        {'responses': row, 'age': int(age), 'gender': GENDER_VARIANTS[g]}
+        for row, age, g in zip(matrix.tolist(), ages, genders)
+    ]
+
+
+def reference_fingerprints(records: List[Dict], scoring_mode: str) -> List[Dict]:
+    """Percentiles, asymmetries and flags via table lookup plus the reference detectors."""
+    tables = reference_tables(scoring_mode)
+    matrix = np.asarray([r['responses'] for r in records])
+    scored = np.where(_REVERSE_MASK, 6 - matrix, matrix)
+    raw = scored.reshape(len(records), len(ASPECTS), 10).sum(axis=2)
+
+    fingerprints = []
+    aspect_index = np.arange(len(ASPECTS))
+    for record, row in zip(records, raw):
+        norm_set = 'University' if record['age'] < 25 else 'ESCS'
+        percentiles = tables[(norm_set, is_female(record['gender']))][aspect_index, row].tolist()
+        scores = {a: _Percentiles(p) for a, p in zip(ASPECTS, percentiles)}
+        fingerprints.append({
+            'norm_set': norm_set,
+            'raw': row.tolist(),
+            'percentiles': percentiles,
+            'asymmetries': [[x.domain, x.higher_aspect, x.percentile_diff]
+                            for x in detect_asymmetries(scores)],
+            'flags': [flag.pattern for flag in detect_clinical_patterns(scores)]
+        })
+    return fingerprints
+
+
+def _compare_fields(expected: Dict, profile: BFASProfile) -> List[str]:
+    actual = profile_fingerprint(profile)
+    return diff_fingerprints(expected, {k: actual[k] for k in expected})
+
+
+def _check_chunk(task: tuple) -> tuple:
+    candidate, scoring_mode, n, seed, max_examples, self_check = task
+    records = random_records(n, seed)
+    expected = reference_fingerprints(records, scoring_mode)
+    profiles = candidate(records, scoring_mode=scoring_mode)
+
+    counts: Dict[str, int] = {}
+    failing = []
+    n_mismatched = 0
+    for record, exp, profile in zip(records, expected, profiles):
+        fields = _compare_fields(exp, profile)
+        if fields:
+            n_mismatched += 1
+            for name in fields:
+                counts[name] = counts.get(name, 0) + 1
+            if len(failing) < max_examples:
+                failing.append((record, fields))
+
+    # Validate the fast reference itself against the real scorer on a slice
+    reference_errors = 0
+    for record, exp in list(zip(records, expected))[:self_check]:
+        real = calculate_all_scores(record['responses'], record['age'], record['gender'],
+                                    scoring_mode=scoring_mode)
+        if _compare_fields(exp, real):
+            reference_errors += 1
+    return n_mismatched, counts, failing, reference_errors
+
+
+def shrink(record: Dict, still_fails: Callable[[Dict], bool]) -> Dict:
+    """Greedily move answers toward 3 while the mismatch persists."""
+    current = dict(record, responses=list(record['responses']))
+    changed = True
+    while changed:
+        changed = False
+        for i, value in enumerate(current['responses']):
+            if value == 3:
+                continue
+            trial = dict(current, responses=list(current['responses']))
+            trial['responses'][i] = value + (1 if value < 3 else -1)
+            if still_fails(trial):
+                current = trial
+                changed = True
+    return current
+
+
+def check_equivalence(
+    candidate: Callable,
+    n: int = 1_000_000,
+    scoring_mode: str = 'normal',
+    seed: int = 0,
+    chunk_size: int = 20_000,
+    workers: Optional[int] = None,
+    max_examples: int = 5,
+    self_check_per_chunk: int = 50
+) -> EquivalenceReport:
+    """
+    Run a candidate batch scorer against the reference on random protocols.
+
+    Args:
+        candidate: Picklable callable(records, scoring_mode=...) -> List[BFASProfile],
+            same contract as calculate_batch_scores
+        n: Number of random response vectors
+        scoring_mode: Mode passed to both candidate and reference
+        seed: Base seed; chunk k uses seed + k, so runs are reproducible
+        chunk_size: Records per worker task
+        workers: Process count (default: all cores; 1 runs in-process)
+        max_examples: Failing inputs kept (shrunk) in the report
+        self_check_per_chunk: Rows per chunk also scored by calculate_all_scores
+            to confirm the fast reference
+
+    Returns:
+        EquivalenceReport with mismatch counts per field and shrunk examples
+    """
+    start = time.perf_counter()
+    sizes = [min(chunk_size, n - offset) for offset in range(0, n, chunk_size)]
+    tasks = [(candidate, scoring_mode, size, seed + k, max_examples, self_check_per_chunk)
+             for k, size in enumerate(sizes)]
+
+    if workers == 1:
+        results = map(_check_chunk, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_check_chunk, tasks)
+
+    n_mismatched, counts, failing, reference_errors = 0, {}, [], 0
+    for chunk_mismatched, chunk_counts, chunk_failing, chunk_reference in results:
+        n_mismatched += chunk_mismatched
+        for name, count in chunk_counts.items():
+            counts[name] = counts.get(name, 0) + count
+        failing.extend(chunk_failing[:max_examples - len(failing)])
+        reference_errors += chunk_reference
+    if workers != 1:
+        executor.shutdown()
+
+    examples = []
+    for record, fields in failing:
+        def still_fails(trial, fields=fields):
+            exp = reference_fingerprints([trial], scoring_mode)[0]
+            return bool(set(fields) & set(_compare_fields(exp, candidate([trial], scoring_mode=scoring_mode)[0])))
+
+        small = shrink(record, still_fails)
+        expected = reference_fingerprints([small], scoring_mode)[0]
+        profile = candidate([small], scoring_mode=scoring_mode)[0]
+        actual = profile_fingerprint(profile)
+        examples.append(Mismatch(
+            fields=_compare_fields(expected, profile),
+            record=small,
+            expected=expected,
+            actual={k: actual[k] for k in expected}
+        ))
+
+    return EquivalenceReport(
+        scoring_mode=scoring_mode,
+        n_checked=n,
+        n_mismatched=n_mismatched,
+        mismatches_by_field=dict(sorted(counts.items())),
+        examples=examples,
+        reference_self_check=reference_errors,
+        elapsed_seconds=round(time.perf_counter() - start, 2)
+    )
+
+
+def load_candidate(spec: str) -> Callable:
+    """Resolve 'module:function' to a callable."""
+    module_name, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='BFAS golden corpus and equivalence harness')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('generate', help='rewrite the golden corpus from the reference engine')
+    check = sub.add_parser('check', help='compare a batch scorer with the golden corpus')
+    check.add_argument('--candidate', default='bfas_scoring:calculate_batch_scores')
+    equiv = sub.add_parser('equivalence', help='random-vector equivalence against the reference')
+    equiv.add_argument('--candidate', default='bfas_scoring:calculate_batch_scores')
+    equiv.add_argument('-n', type=int, default=1_000_000)
+    equiv.add_argument('--mode', choices=SCORING_MODES, default='normal')
+    equiv.add_argument('--seed', type=int, default=0)
+    equiv.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        print(f"Wrote {generate_corpus()} cases to {CORPUS_PATH}")
+    elif args.command == 'check':
+        failures = check_corpus(load_candidate(args.candidate))
+        for case_id, fields in failures.items():
+            print(f"MISMATCH {case_id}: {', '.join(fields)}")
+        print("Golden corpus: " + ("OK" if not failures else f"{len(failures)} mismatches"))
+        raise SystemExit(1 if failures else 0)
+    else:
+        report = check_equivalence(load_candidate(args.candidate), n=args.n,
+                                   scoring_mode=args.mode, seed=args.seed, workers=args.workers)
+        print(json.dumps({
+            'scoring_mode': report.scoring_mode,
+            'n_checked': report.n_checked,
+            'n_mismatched': report.n_mismatched,
+            'mismatches_by_field': report.mismatches_by_field,
+            'reference_self_check_failures': report.reference_self_check,
+            'elapsed_seconds': report.elapsed_seconds,
+            'examples': [
+                {'fields': m.fields, 'record': m.record, 'expected': m.expected, 'actual': m.actual}
+                for m in report.examples
+            ]
+        }, indent=2))
+        raise SystemExit(0 if report.equivalent else 1)
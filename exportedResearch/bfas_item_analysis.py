@@ -0,0 +1,349 @@
+"""
+BFAS Item Analysis Engine
+Streaming reliability and item statistics over large response sets.
+Accumulates sufficient statistics (counts, sums, cross-products) in a single
+pass, so memory stays bounded by the item count rather than the row count.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+import csv
+import json
+
+import numpy as np
+
+from bfas_scoring import ASPECT_RANGES, REVERSE_ITEMS
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+N_ITEMS = 100
+N_OPTIONS = 5
+
+# +1 for forward-keyed items, -1 for reverse-keyed (6 - x flips covariance signs)
+ITEM_KEYS = np.ones(N_ITEMS)
+for _reverse in REVERSE_ITEMS.values():
+    ITEM_KEYS[[item - 1 for item in _reverse]] = -1.0
+
+ASPECT_ITEM_INDEX = {
+    aspect: np.arange(start - 1, end)
+    for aspect, (start, end) in ASPECT_RANGES.items()
+}
+
+
+# ============================================================================
+# DATA STRUCTURES
+# ============================================================================
+
+@dataclass
+class AspectReliability:
+    aspect: str
+    cronbach_alpha: float
+    item_total_correlations: Dict[int, float]  # corrected (item vs. rest of aspect)
+    item_means: Dict[int, float]  # raw responses, before reverse coding
+    response_distributions: Dict[int, List[float]]  # proportion choosing 1-5
+    reverse_item_correlations: Dict[int, float]  # raw reverse item vs. forward-item total
+    reverse_keying_ok: bool  # True if every reverse item correlates negatively
+
+
+@dataclass
+class ItemAnalysisReport:
+    n_respondents: int
+    aspects: Dict[str, AspectReliability]
+    inter_aspect_correlations: Dict[str, Dict[str, float]]
+
+
+# ============================================================================
+# ACCUMULATION
+# ============================================================================
+
+class ItemStatistics:
+    """
+    Sufficient statistics for item analysis, updated chunk by chunk.
+
+    Holds an item sum vector, an item cross-product matrix and per-item
+    response counts. Responses are small integers, so float64 sums stay exact
+    well past billions of rows.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.sums = np.zeros(N_ITEMS)
+        self.cross_products = np.zeros((N_ITEMS, N_ITEMS))
+        self.counts = np.zeros((N_ITEMS, N_OPTIONS), dtype=np.int64)
+
+    def update(self, responses) -> None:
+        """Add a chunk of raw responses, shape (n_rows, 100), values 1-5."""
+        chunk = validate_response_matrix(responses)
+        if chunk.shape[0] == 0:
+            return
+
+        values = chunk.astype(np.float64)
+        self.n += chunk.shape[0]
+        self.sums += values.sum(axis=0)
+        self.cross_products += values.T @ values
+
+        # One bincount over (item, option) pairs instead of a loop per item
+        flat = (np.arange(N_ITEMS) * N_OPTIONS + (chunk - 1)).ravel()
+        self.counts += np.bincount(flat, minlength=N_ITEMS * N_OPTIONS).reshape(N_ITEMS, N_OPTIONS)
+
+    def merge(self, other: 'ItemStatistics') -> None:
+        """Combine statistics accumulated elsewhere (e.g. another worker)."""
+        self.n += other.n
+        self.sums += other.sums
+        self.cross_products += other.cross_products
+        self.counts += other.counts
+
+    def means(self) -> np.ndarray:
+        return self.sums / self.n
+
+    def covariance(self) -> np.ndarray:
+        """Sample covariance of raw item responses."""
+        if self.n < 2:
+            raise ValueError(f"Need at least 2 respondents, got {self.n}")
+        return (self.cross_products - np.outer(self.sums, self.sums) / self.n) / (self.n - 1)
+
+    def report(self) -> ItemAnalysisReport:
+        """Derive reliability and item statistics from the accumulated sums."""
+        raw_cov = self.covariance()
+        scored_cov = raw_cov * np.outer(ITEM_KEYS, ITEM_KEYS)
+        means = self.means()
+        proportions = self.counts / self.n
+
+        aspects = {
+            aspect: _aspect_reliability(aspect, raw_cov, scored_cov, means, proportions)
+            for aspect in ASPECT_RANGES
+        }
+
+        # Aspect totals are sums of scored items, so their covariance is a block sum
+        names = list(ASPECT_RANGES)
+        membership = np.zeros((len(names), N_ITEMS))
+        for row, aspect in enumerate(names):
+            membership[row, ASPECT_ITEM_INDEX[aspect]] = 1.0
+        total_cov = membership @ scored_cov @ membership.T
+        total_corr = _cov_to_corr(total_cov)
+
+        inter_aspect = {
+            a: {b: round(float(total_corr[i, j]), 3) for j, b in enumerate(names)}
+            for i, a in enumerate(names)
+        }
+
+        return ItemAnalysisReport(
+            n_respondents=self.n,
+            aspects=aspects,
+            inter_aspect_correlations=inter_aspect
+        )
+
+
+def _aspect_reliability(
+    aspect: str,
+    raw_cov: np.ndarray,
+    scored_cov: np.ndarray,
+    means: np.ndarray,
+    proportions: np.ndarray
+) -> AspectReliability:
+    idx = ASPECT_ITEM_INDEX[aspect]
+    k = len(idx)
+    block = scored_cov[np.ix_(idx, idx)]
+
+    # Cronbach's alpha: k/(k-1) * (1 - sum(item variances) / total variance)
+    item_vars = np.diag(block)
+    total_var = block.sum()
+    alpha = k / (k - 1) * (1 - item_vars.sum() / total_var) if total_var > 0 else float('nan')
+
+    # Corrected item-total: cov(item, total - item) / sqrt(var(item) * var(total - item))
+    cov_with_rest = block.sum(axis=1) - item_vars
+    rest_var = total_var - 2 * block.sum(axis=1) + item_vars
+    item_total = _safe_divide(cov_with_rest, np.sqrt(item_vars * rest_var))
+
+    # Reverse items on their raw scale against the aspect's forward-keyed total
+    forward = [i for i in idx if ITEM_KEYS[i] > 0]
+    forward_var = raw_cov[np.ix_(forward, forward)].sum()
+    reverse_corr = {}
+    for item in REVERSE_ITEMS[aspect]:
+        i = item - 1
+        cov = raw_cov[i, forward].sum()
+        reverse_corr[item] = float(_safe_divide(cov, np.sqrt(raw_cov[i, i] * forward_var)))
+
+    item_ids = [int(i) + 1 for i in idx]
+    return AspectReliability(
+        aspect=aspect,
+        cronbach_alpha=round(float(alpha), 3),
+        item_total_correlations={
+            item: round(float(r), 3) for item, r in zip(item_ids, item_total)
+        },
+        item_means={item: round(float(means[item - 1]), 2) for item in item_ids},
+        response_distributions={
+            item: [round(float(p), 3) for p in proportions[item - 1]] for item in item_ids
+        },
+        reverse_item_correlations={item: round(r, 3) for item, r in reverse_corr.items()},
+        reverse_keying_ok=all(r < 0 for r in reverse_corr.values())
+    )
+
+
+def _safe_divide(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), np.nan)
+
+
+def _cov_to_corr(cov: np.ndarray) -> np.ndarray:
+    sd = np.sqrt(np.diag(cov))
+    return _safe_divide(cov, np.outer(sd, sd))
+
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def validate_response_matrix(responses) -> np.ndarray:
+    """Validate a chunk of response vectors and return it as an int array."""
+    chunk = np.asarray(responses)
+    if chunk.ndim != 2 or chunk.shape[1] != N_ITEMS:
+        raise ValueError(f"Expected shape (n, {N_ITEMS}), got {chunk.shape}")
+    if chunk.size and not np.issubdtype(chunk.dtype, np.integer):
+        raise TypeError(f"Responses must be integers, got {chunk.dtype}")
+    if chunk.size and (chunk.min() < 1 or chunk.max() > N_OPTIONS):
+        raise ValueError(f"Responses out of range [1-{N_OPTIONS}]")
+    return chunk
+
+
+def iter_csv_chunks(path: str, chunk_size: int = 10000,
+                    has_header: bool = True) -> Iterator[np.ndarray]:
+    """Stream a CSV of 100 response columns per row as integer chunks."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        if has_header:
+            next(reader, None)
+        rows = []
+        for row in reader:
+            rows.append([int(value) for value in row[:N_ITEMS]])
+            if len(rows) >= chunk_size:
+                yield np.array(rows, dtype=np.int64)
+                rows = []
+        if rows:
+            yield np.array(rows, dtype=np.int64)
+
+
+def analyze_responses(chunks: Iterable, stats: Optional[ItemStatistics] = None) -> ItemAnalysisReport:
+    """
+    Run item analysis over a stream of response chunks in one pass.
+
+    Args:
+        chunks: Iterable of (n_rows, 100) arrays or nested lists, raw values 1-5
+        stats: Optional accumulator to continue from
+
+    Returns:
+        ItemAnalysisReport with alpha, item-total and inter-aspect correlations
+    """
+    stats = stats or ItemStatistics()
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats.report()
+
+
+def aspect_raw_score_counts(chunks: Iterable) -> Dict[str, np.ndarray]:
+    """
+    Frequency of each raw aspect total (10-50) over a stream of response
+    chunks, reverse keying applied. Input for bfas_scoring.save_cdf_tables().
+    """
+    counts = {aspect: np.zeros(41, dtype=np.int64) for aspect in ASPECT_ITEM_INDEX}
+    for chunk in chunks:
+        chunk = validate_response_matrix(chunk)
+        scored = np.where(ITEM_KEYS < 0, 6 - chunk, chunk)
+        for aspect, idx in ASPECT_ITEM_INDEX.items():
+            totals = scored[:, idx].sum(axis=1)
+            counts[aspect] += np.bincount(totals - 10, minlength=41)
+    return counts
+
+
+# ============================================================================
+# OUTPUT FORMATTING
+# ============================================================================
+
+def format_item_analysis(report: ItemAnalysisReport) -> Dict:
+    """Format item analysis report for JSON export."""
+    return {
+        'n_respondents': report.n_respondents,
+        'aspects': {
+            aspect: {
+                'cronbach_alpha': rel.cronbach_alpha,
+                'item_total_correlations': rel.item_total_correlations,
+                'item_means': rel.item_means,
+                'response_distributions': rel.response_distributions,
+                'reverse_item_correlations': rel.reverse_item_correlations,
+                'reverse_keying_ok': rel.reverse_keying_ok
+            }
+            for aspect, rel in report.aspects.items()
+        },
+        'inter_aspect_correlations': report.inter_aspect_correlations
+    }
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+def build_cdf_tables_cli(argv: List[str]) -> None:
+    """
+    Observed percentile tables for BFAS_SCORING_MODE=empirical:
+      python bfas_item_analysis.py cdf-tables responses.csv tables.json --norm-set ESCS [--female]
+    Run once per norm group (e.g. ESCS female, ESCS male); an existing
+    output file is merged into, counts for the same group are added.
+    """
+    import argparse
+    import os
+    from bfas_scoring import NORM_SETS, save_cdf_tables
+
+    parser = argparse.ArgumentParser(prog='bfas_item_analysis.py cdf-tables')
+    parser.add_argument('responses', help='CSV with 100 response columns per row')
+    parser.add_argument('output', help='table file to create or merge into')
+    parser.add_argument('--norm-set', required=True, choices=sorted(NORM_SETS))
+    parser.add_argument('--female', action='store_true', help='sample is the female norm group')
+    parser.add_argument('--no-header', action='store_true')
+    args = parser.parse_args(argv)
+
+    merged, source = {}, []
+    if os.path.exists(args.output):
+        with open(args.output, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        source = [existing['source']] if existing.get('source') else []
+        for entry in existing['tables']:
+            merged[(entry['norm_set'], entry['female'], entry['aspect'])] = np.array(entry['counts'])
+
+    counts = aspect_raw_score_counts(iter_csv_chunks(args.responses, has_header=not args.no_header))
+    for aspect, values in counts.items():
+        key = (args.norm_set, args.female, aspect)
+        merged[key] = merged.get(key, 0) + values
+
+    source.append(f"{os.path.basename(args.responses)} ({args.norm_set}{', female' if args.female else ''})")
+    save_cdf_tables(args.output, merged, source='; '.join(source))
+    n = int(next(iter(counts.values())).sum())
+    print(f"{n} respondents -> {len(counts)} tables for {args.norm_set}"
+          f"{' female' if args.female else ''} in {args.output}")
+
+
+if __name__ == '__main__':
+    import sys
+    if sys.argv[1:2] == ['cdf-tables']:
+        build_cdf_tables_cli(sys.argv[2:])
+        sys.exit(0)
+
+    # Synthetic respondents: one latent trait per aspect drives all its items
+    rng = np.random.default_rng(0)
+
+    def synthetic_chunk(n):
+        traits = rng.normal(size=(n, len(ASPECT_RANGES)))
+        latent = np.repeat(traits, 10, axis=1) * ITEM_KEYS
+        noisy = 3 + latent + rng.normal(scale=0.8, size=(n, N_ITEMS))
+        return np.clip(np.rint(noisy), 1, 5).astype(np.int64)
+
+    report = analyze_responses(synthetic_chunk(5000) for _ in range(20))
+    summary = format_item_analysis(report)
+
+    print(f"Respondents: {summary['n_respondents']}")
+    for aspect, rel in summary['aspects'].items():
+        print(f"{aspect:16s} alpha={rel['cronbach_alpha']:.3f} "
+              f"reverse_ok={rel['reverse_keying_ok']}")
+    print(json.dumps(summary['inter_aspect_correlations']['openness'], indent=2))
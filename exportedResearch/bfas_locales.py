@@ -0,0 +1,194 @@
+"""
+BFAS Locale Packs
+Per-language instrument items, scale labels, gender vocabularies and
+knowledge-base chunks, declared in bfas_locales.json. Scoring is shared:
+every pack maps onto the same 100 item ids and canonical genders.
+
+Packs load lazily on first use and stay cached for the life of the process,
+so memory grows with the locales actually requested, not with the registry.
+The instrument and the knowledge base are cached separately because the
+knowledge base is only needed on the results page. Gender vocabularies are
+small and live in the manifest itself, so every registered locale's terms
+are accepted by scoring from import on, whichever packs have been loaded.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+import json
+import os
+
+from bfas_scoring import ASPECT_RANGES, register_gender_aliases
+from bfas_templates import SnippetIndex, build_snippet_index
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+LOCALES_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_PATH = os.path.join(LOCALES_DIR, 'bfas_locales.json')
+
+N_ITEMS = max(end for _, end in ASPECT_RANGES.values())
+
+
+@dataclass
+class LocalePack:
+    """Everything the assessment pages need for one language."""
+    code: str
+    name: str
+    instrument: Dict
+    scale_labels: Dict[str, str]
+    gender_options: Dict[str, Optional[str]]
+    interpretation_language: str
+    knowledge_base_paths: List[str]
+
+    @property
+    def items(self) -> List[Dict]:
+        return self.instrument['items']
+
+    def canonical_gender(self, option: str) -> Optional[str]:
+        """Map a gender option label shown in this locale to a canonical gender."""
+        if option not in self.gender_options:
+            raise ValueError(f"Unknown gender option {option!r} for locale {self.code}")
+        return self.gender_options[option]
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+@lru_cache(maxsize=1)
+def load_registry(path: str = REGISTRY_PATH) -> Dict:
+    """Locale manifest: file references only, no pack content."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def available_locales() -> Dict[str, str]:
+    """Locale code -> display name."""
+    return {code: entry['name'] for code, entry in load_registry()['locales'].items()}
+
+
+def match_locale(requested: Optional[str]) -> Optional[str]:
+    """Registered locale for a code (exact, then language prefix), or None."""
+    locales = load_registry()['locales']
+    if requested:
+        requested = requested.replace('_', '-').lower()
+        if requested in locales:
+            return requested
+        if requested.split('-')[0] in locales:
+            return requested.split('-')[0]
+    return None
+
+
+def default_locale() -> str:
+    """BFAS_DEFAULT_LOCALE resolved against the registry, else the manifest default."""
+    configured = os.getenv('BFAS_DEFAULT_LOCALE') or load_registry()['default']
+    code = match_locale(configured)
+    if code is None:
+        raise ValueError(f"Default locale {configured!r} is not registered; "
+                         f"available: {sorted(load_registry()['locales'])}")
+    return code
+
+
+def resolve_locale(requested: Optional[str]) -> str:
+    """Requested locale if registered (exact, then language prefix), else the default."""
+    return match_locale(requested) or default_locale()
+
+
+def _entry(code: str) -> Dict:
+    locales = load_registry()['locales']
+    if code not in locales:
+        raise ValueError(f"Unknown locale {code!r}; available: {sorted(locales)}")
+    return locales[code]
+
+
+def _resolve(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(LOCALES_DIR, path)
+
+
+def register_locale_genders(path: str = REGISTRY_PATH) -> None:
+    """Register the gender options and aliases of every locale in the manifest."""
+    for entry in load_registry(path)['locales'].values():
+        register_gender_aliases({v: v for v in entry['gender_options'].values() if v})
+        register_gender_aliases(entry.get('gender_aliases', {}))
+
+
+register_locale_genders()
+
+# Fail at startup, not on the first page view, if the default is misconfigured
+default_locale()
+
+
+# ============================================================================
+# LOADING
+# ============================================================================
+
+def validate_instrument(instrument: Dict, code: str) -> None:
+    """A pack must cover the shared item ids 1-100 on the 1-5 scale."""
+    ids = sorted(item['id'] for item in instrument['items'])
+    if ids != list(range(1, N_ITEMS + 1)):
+        raise ValueError(f"Locale {code}: instrument must define item ids 1-{N_ITEMS}")
+    labels = instrument['instrument']['scale']['labels']
+    if sorted(labels) != [str(v) for v in range(1, 6)]:
+        raise ValueError(f"Locale {code}: scale labels must cover 1-5")
+
+
+@lru_cache(maxsize=None)
+def load_locale_pack(code: str) -> LocalePack:
+    """Instrument, labels and vocabulary for a locale, loaded once per process."""
+    entry = _entry(code)
+    with open(_resolve(entry['instrument']), 'r', encoding='utf-8') as f:
+        instrument = json.load(f)
+    validate_instrument(instrument, code)
+
+    return LocalePack(
+        code=code,
+        name=entry['name'],
+        instrument=instrument,
+        scale_labels=instrument['instrument']['scale']['labels'],
+        gender_options=entry['gender_options'],
+        interpretation_language=entry.get('interpretation_language', 'English'),
+        knowledge_base_paths=[_resolve(p) for p in entry['knowledge_base']]
+    )
+
+
+@lru_cache(maxsize=None)
+def load_knowledge_base(code: str) -> str:
+    """Knowledge-base chunks for a locale, concatenated in manifest order."""
+    chunks = []
+    for path in load_locale_pack(code).knowledge_base_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            chunks.append(f.read())
+    return '\n\n'.join(chunks)
+
+
+@lru_cache(maxsize=None)
+def load_snippet_index(code: str) -> SnippetIndex:
+    """Local-interpretation snippet index over a locale's knowledge-base chunks."""
+    return build_snippet_index(load_knowledge_base(code))
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == '__main__':
+    import time
+
+    print(f"Registered: {available_locales()}, default {default_locale()}")
+    for requested in (None, 'en-GB', 'sv_SE', 'fr'):
+        print(f"  resolve_locale({requested!r}) -> {resolve_locale(requested)}")
+
+    for code in available_locales():
+        start = time.perf_counter()
+        pack = load_locale_pack(code)
+        first = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        load_locale_pack(code)
+        cached = (time.perf_counter() - start) * 1e6
+        print(f"{code}: {len(pack.items)} items, first load {first:.2f} ms, cached {cached:.2f} us, "
+              f"packs resident {load_locale_pack.cache_info().currsize}, "
+              f"item 1 {pack.items[0]['text']!r}")
+    print(f"Knowledge bases resident: {load_knowledge_base.cache_info().currsize}")
@@ -0,0 +1,266 @@
+"""
+BFAS Metrics
+Lightweight in-process instrumentation: counters and fixed-bucket latency
+histograms rendered in the Prometheus text exposition format. Exposed through
+an HTTP scrape endpoint and/or a textfile sink (node_exporter textfile format).
+No third-party dependencies; one lock and a few dict operations per event.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+# Seconds; spans in-memory scoring (sub-ms) up to the LLM call (30-60 s)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRIC_HELP = {
+    'bfas_stage_latency_seconds': ('histogram', 'Latency per pipeline stage'),
+    'bfas_stage_errors_total': ('counter', 'Exceptions raised per stage, by class'),
+    'bfas_llm_tokens_total': ('counter', 'LLM tokens by kind (input, output, cache_read, cache_creation)'),
+    'bfas_llm_requests_total': ('counter', 'LLM requests by model'),
+    'bfas_prompt_estimated_tokens_total': ('counter', 'Estimated prompt tokens by template version and section'),
+    'bfas_prompts_total': ('counter', 'Prompts assembled by template version'),
+    'bfas_cache_lookups_total': ('counter', 'Cached loader calls'),
+    'bfas_cache_misses_total': ('counter', 'Cached loader calls that executed the loader body'),
+    'bfas_page_entries_total': ('counter', 'Sessions entering each page'),
+    'bfas_page_transitions_total': ('counter', 'Page-to-page transitions through the router'),
+}
+
+# Scrape endpoint binds to loopback unless a deployment opts into more
+DEFAULT_HTTP_HOST = '127.0.0.1'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by metric name and label set."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        # Per label set: [count per bucket..., +Inf count, sum]
+        self._histograms: Dict[str, Dict[LabelKey, list]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._counters[name][key] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms[name].get(key)
+            if series is None:
+                series = self._histograms[name][key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()}
+                          for name, series in self._histograms.items()}
+
+        lines = []
+        for name in sorted(set(counters) | set(histograms)):
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key, value in sorted(counters.get(name, {}).items()):
+                lines.append(f'{name}{_format_labels(key)} {value:g}')
+            for key, series in sorted(histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(key + (("le", f"{bound:g}"),))} {cumulative}')
+                cumulative += series[len(self.buckets)]
+                lines.append(f'{name}_bucket{_format_labels(key + (("le", "+Inf"),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(key)} {series[-1]:.6f}')
+                lines.append(f'{name}_count{_format_labels(key)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in key) + '}'
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ============================================================================
+# RECORDING HELPERS
+# ============================================================================
+
+@contextmanager
+def timed(stage: str, registry: MetricsRegistry = REGISTRY):
+    """
+    Record stage latency, and the exception class if the stage raises.
+    Usable as a context manager or a decorator.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        registry.inc('bfas_stage_errors_total', stage=stage, error=type(e).__name__)
+        raise
+    finally:
+        registry.observe('bfas_stage_latency_seconds', time.perf_counter() - start, stage=stage)
+
+
+def record_llm_usage(usage, model: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """Record token counts from an Anthropic response's `usage` object."""
+    registry.inc('bfas_llm_requests_total', model=model)
+    for kind, attr in (('input', 'input_tokens'),
+                       ('output', 'output_tokens'),
+                       ('cache_read', 'cache_read_input_tokens'),
+                       ('cache_creation', 'cache_creation_input_tokens')):
+        value = getattr(usage, attr, None)
+        if value:
+            registry.inc('bfas_llm_tokens_total', value, model=model, kind=kind)
+
+
+def record_prompt_report(report, registry: MetricsRegistry = REGISTRY) -> None:
+    """Record an assembled prompt's estimated size (bfas_prompt.PromptReport)."""
+    registry.inc('bfas_prompts_total', version=report.version)
+    for section, tokens in report.section_tokens.items():
+        registry.inc('bfas_prompt_estimated_tokens_total', tokens,
+                     version=report.version, section=section)
+
+
+def record_cache_lookup(cache: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """Call before a cached loader; pair with record_cache_miss inside its body."""
+    registry.inc('bfas_cache_lookups_total', cache=cache)
+
+
+def record_cache_miss(cache: str, registry: MetricsRegistry = REGISTRY) -> None:
+    registry.inc('bfas_cache_misses_total', cache=cache)
+
+
+def record_page_entry(page: str, previous: Optional[str], registry: MetricsRegistry = REGISTRY) -> None:
+    """Count funnel progress when a session's router lands on a new page."""
+    registry.inc('bfas_page_entries_total', page=page)
+    registry.inc('bfas_page_transitions_total', source=previous or 'start', target=page)
+
+
+# ============================================================================
+# EXPOSITION
+# ============================================================================
+
+def start_http_exporter(port: int, registry: MetricsRegistry = REGISTRY,
+                        host: str = DEFAULT_HTTP_HOST) -> ThreadingHTTPServer:
+    """Serve GET /metrics on a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep scrapes out of the app log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='bfas-metrics-http', daemon=True).start()
+    return server
+
+
+def write_metrics_file(path: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """Atomically write the current metrics (textfile collector format)."""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def start_file_sink(path: str, interval: float = 15.0,
+                    registry: MetricsRegistry = REGISTRY) -> threading.Thread:
+    """
+    Rewrite the metrics file every `interval` seconds on a daemon thread.
+    A failed write (full disk, permissions) is logged once and retried on
+    the next tick, so the sink recovers instead of dying with the thread.
+    """
+
+    def run():
+        failing = False
+        while True:
+            try:
+                write_metrics_file(path, registry)
+                if failing:
+                    logger.info("Metrics file %s is being written again", path)
+                failing = False
+            except Exception:
+                if not failing:
+                    logger.warning("Could not write metrics file %s; retrying every %g s",
+                                   path, interval, exc_info=True)
+                failing = True
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name='bfas-metrics-file', daemon=True)
+    thread.start()
+    return thread
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == '__main__':
+    # Per-event overhead of the recording path
+    registry = MetricsRegistry()
+    n = 200000
+
+    start = time.perf_counter()
+    for _ in range(n):
+        with timed('overhead', registry):
+            pass
+    per_timed = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    for _ in range(n):
+        registry.inc('bfas_page_entries_total', page='results')
+    per_inc = (time.perf_counter() - start) / n
+
+    print(f"timed(): {per_timed * 1e6:.2f} us/event, inc(): {per_inc * 1e6:.2f} us/event")
+    print(registry.render()[:600])
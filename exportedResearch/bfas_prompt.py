@@ -0,0 +1,183 @@
+"""
+BFAS Interpretation Prompt
+Versioned prompt template for the LLM interpretation and a compact,
+model-oriented serialization of format_profile_summary() output.
+
+The compact profile keeps everything the prompt asks the model to use
+(percentiles, z-scores, domain totals, asymmetries, flag patterns) in one
+line per domain, with clinical flags listed once and referenced by id.
+Fields the model is told not to use (clinician-facing recommendations) and
+values derivable from others (raw/mean aspect scores) are left out.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from bfas_scoring import ASPECT_TO_DIMENSION
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+# Bump when the template or the profile serialization changes; recorded with
+# every call so token counts and outputs can be compared across versions
+PROMPT_VERSION = 'v3-compact-lang'
+
+# Rough chars-per-token ratio for English/markdown; the exact count comes
+# back from the API as usage.input_tokens
+CHARS_PER_TOKEN = 4
+
+PROMPT_TEMPLATE = """You are an expert personality psychologist interpreting BFAS (Big Five Aspect Scale) results.
+
+KNOWLEDGE BASE:
+{knowledge_base}
+
+PROFILE DATA:
+{profile}
+
+Generate a personalized, engaging interpretation (800-1200 words) that:
+
+1. Opens with a brief overview of what makes this profile distinctive
+2. Covers each of the 5 dimensions, highlighting:
+   - The person's percentile scores for both aspects
+   - What these scores mean behaviorally (use specific examples)
+   - Any significant asymmetries between aspects within a dimension
+3. Identifies 2-3 key strengths from the profile
+4. Notes 1-2 potential growth areas (phrased constructively)
+5. If clinical flags are present, mention them sensitively with appropriate disclaimers
+
+IMPORTANT GUIDELINES:
+- Use second person ("you") throughout
+- Be warm but scientifically grounded
+- Avoid clinical/diagnostic language unless flags are present
+- Highlight the unique pattern of aspects, not just domain scores
+- Use the knowledge base for evidence-based interpretations
+- End with an empowering reflection
+- Be concise and direct (eliminate filler words and unnecessary elaboration)
+
+Do NOT include:
+- Rigid structure with headers for each dimension
+- Repetitive percentile listings
+- Generic personality descriptions
+- Medical advice
+- Verbose explanations or redundant phrases
+
+Write in flowing paragraphs that feel personalized and insightful. Write the interpretation in {language}."""
+
+
+@dataclass
+class PromptReport:
+    """Size of one assembled prompt, per section; actual counts filled from usage."""
+    version: str
+    chars: int
+    estimated_tokens: int
+    section_tokens: Dict[str, int]
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+def format_compact_profile(profile_summary: Dict) -> str:
+    """
+    Dense text form of a profile summary, e.g.
+
+        norms ESCS; age 29; gender female; aspect pct=percentile, *=female norms
+        neuroticism (raw 61/100): withdrawal 72 z0.58* [F1], volatility 55 z0.13 [F1]
+        asymmetry: agreeableness compassion>politeness by 31 pct
+        F1 max_dysregulation (high): Combined internalizing and externalizing distress pattern
+    """
+    meta = profile_summary['metadata']
+    aspects = profile_summary['aspect_scores']
+
+    # Flag ids in detection order; each aspect lists the flags it takes part in
+    flag_ids: Dict[str, List[str]] = {}
+    flag_lines = []
+    for i, flag in enumerate(profile_summary['clinical_flags'], 1):
+        flag_id = f'F{i}'
+        for aspect in flag['aspects']:
+            flag_ids.setdefault(aspect, []).append(flag_id)
+        flag_lines.append(f"{flag_id} {flag['pattern']} ({flag['severity']}): {flag['message']}")
+
+    lines = [f"norms {meta['norm_set']}; age {meta['age']}; gender {meta['gender'] or 'n/a'}; "
+             f"aspect pct=percentile, *=female norms"]
+
+    by_domain: Dict[str, List[str]] = {}
+    for aspect, score in aspects.items():
+        cell = f"{aspect} {score['percentile']} z{score['z_score']:.2f}"
+        if score['gender_adjusted']:
+            cell += '*'
+        if aspect in flag_ids:
+            cell += f" [{','.join(flag_ids[aspect])}]"
+        by_domain.setdefault(ASPECT_TO_DIMENSION[aspect], []).append(cell)
+
+    for domain, cells in by_domain.items():
+        raw = profile_summary['dimension_scores'].get(domain)
+        lines.append(f"{domain} (raw {raw}/100): {', '.join(cells)}")
+
+    for asym in profile_summary['asymmetries']:
+        lower = next(a for a in asym['aspects'] if a != asym['higher_aspect'])
+        lines.append(f"asymmetry: {asym['domain']} {asym['higher_aspect']}>{lower} "
+                     f"by {asym['percentile_difference']} pct")
+
+    lines.extend(flag_lines or ['flags: none'])
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# PROMPT ASSEMBLY
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def build_interpretation_prompt(profile_summary: Dict, knowledge_base: str,
+                                language: str = 'English') -> tuple:
+    """Return (prompt, PromptReport) for the current PROMPT_VERSION."""
+    profile = format_compact_profile(profile_summary)
+    prompt = PROMPT_TEMPLATE.format(knowledge_base=knowledge_base, profile=profile,
+                                    language=language)
+
+    kb_tokens = estimate_tokens(knowledge_base)
+    profile_tokens = estimate_tokens(profile)
+    total = estimate_tokens(prompt)
+    report = PromptReport(
+        version=PROMPT_VERSION,
+        chars=len(prompt),
+        estimated_tokens=total,
+        section_tokens={
+            'knowledge_base': kb_tokens,
+            'profile': profile_tokens,
+            'instructions': max(0, total - kb_tokens - profile_tokens)
+        }
+    )
+    return prompt, report
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == '__main__':
+    import json
+    import os
+    from bfas_scoring import calculate_all_scores, format_profile_summary
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'test_profiles.json'), 'r') as f:
+        profiles = json.load(f)
+
+    for name, data in profiles.items():
+        summary = format_profile_summary(
+            calculate_all_scores(data['responses'], data.get('age', 30), data.get('gender'))
+        )
+        before = estimate_tokens(json.dumps(summary, indent=2))
+        compact = format_compact_profile(summary)
+        print(f"{name:22s} profile tokens: {before:4d} pretty JSON -> {estimate_tokens(compact):4d} compact")
+
+    print()
+    print(compact)
@@ -0,0 +1,289 @@
+"""
+BFAS Response Quality Screening
+Careless-responding indicators computed in one vectorized pass over a batch:
+longstring runs, intra-individual response variability, acquiescence and
+inconsistency across forward/reverse item pairs, and page completion speed.
+"""
+
+from dataclasses import dataclass
+from typing import List, Dict, Optional
+import json
+
+import numpy as np
+
+from bfas_scoring import ASPECT_RANGES, REVERSE_ITEMS
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+N_ITEMS = 100
+ITEMS_PER_PAGE = 10
+
+# Longest run of identical answers; pages are 10 items, so 25+ spans more than two pages
+MAX_LONGSTRING = 25
+
+# Intra-individual response variability (SD across all 100 raw answers)
+MIN_IRV = 0.4
+
+# Acquiescence: mean raw answer on forward and reverse items, centred on 3.
+# Consistent responders land near 0 because reverse items pull the other way.
+MAX_ACQUIESCENCE = 1.0
+
+# Inconsistency: mean |forward mean - reverse-coded mean| across aspects
+MAX_INCONSISTENCY = 1.75
+
+# Speeding: seconds per item on the fastest page (Huang et al. 2012 use ~2 s)
+MIN_SECONDS_PER_ITEM = 2.0
+
+# Flags that invalidate a protocol on their own
+INVALIDATING_FLAGS = ('longstring', 'low_variability', 'speeding')
+
+_FORWARD_INDEX = {}
+_REVERSE_INDEX = {}
+for _aspect, (_start, _end) in ASPECT_RANGES.items():
+    _reverse = set(REVERSE_ITEMS[_aspect])
+    _FORWARD_INDEX[_aspect] = [i - 1 for i in range(_start, _end + 1) if i not in _reverse]
+    _REVERSE_INDEX[_aspect] = [i - 1 for i in sorted(_reverse)]
+
+
+# ============================================================================
+# DATA STRUCTURES
+# ============================================================================
+
+@dataclass
+class ResponseQuality:
+    longstring: int
+    irv: float
+    acquiescence: Optional[float]  # None if no forward/reverse pair was given
+    inconsistency: Optional[float]
+    min_seconds_per_item: Optional[float]
+    flags: List[str]
+    valid: bool  # False if the protocol should not be interpreted
+
+
+# ============================================================================
+# INDICATORS
+# ============================================================================
+
+def longstring(matrix: np.ndarray) -> np.ndarray:
+    """Longest run of identical consecutive answers per row."""
+    n_rows, n_cols = matrix.shape
+    positions = np.broadcast_to(np.arange(n_cols), (n_rows, n_cols))
+    changes = np.ones((n_rows, n_cols), dtype=bool)
+    changes[:, 1:] = matrix[:, 1:] != matrix[:, :-1]
+    # Position where the current run started, carried forward across the row
+    run_start = np.maximum.accumulate(np.where(changes, positions, 0), axis=1)
+    return (positions - run_start + 1).max(axis=1)
+
+
+def irv(matrix: np.ndarray) -> np.ndarray:
+    """Intra-individual response variability (population SD per row)."""
+    return matrix.std(axis=1)
+
+
+def keyed_pair_means(matrix: np.ndarray) -> tuple:
+    """Per-aspect mean raw answer on forward items and on reverse items, shape (n, 10)."""
+    forward = np.stack([matrix[:, idx].mean(axis=1) for idx in _FORWARD_INDEX.values()], axis=1)
+    reverse = np.stack([matrix[:, idx].mean(axis=1) for idx in _REVERSE_INDEX.values()], axis=1)
+    return forward, reverse
+
+
+def acquiescence(forward: np.ndarray, reverse: np.ndarray) -> np.ndarray:
+    """Agreement regardless of keying: 0 is balanced, +2 is all 5s, -2 is all 1s."""
+    return ((forward + reverse) / 2 - 3).mean(axis=1)
+
+
+def inconsistency(forward: np.ndarray, reverse: np.ndarray) -> np.ndarray:
+    """Mean gap between forward answers and reverse-coded answers within each aspect."""
+    return np.abs(forward - (6 - reverse)).mean(axis=1)
+
+
+def min_seconds_per_item(page_seconds: np.ndarray, page_items=None) -> np.ndarray:
+    """
+    Fastest page pace per row; pages not timed are passed as NaN. page_items
+    gives the number of items each page showed (a resumed page may show fewer
+    than ITEMS_PER_PAGE); without it every page counts as full.
+    """
+    items = ITEMS_PER_PAGE if page_items is None else np.asarray(page_items, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pace = np.asarray(page_seconds, dtype=float) / items
+    pace = np.where(np.isnan(pace), np.inf, pace)
+    fastest = pace.min(axis=1)
+    return np.where(np.isinf(fastest), np.nan, fastest)
+
+
+# ============================================================================
+# SCREENING
+# ============================================================================
+
+def compute_quality_indicators(
+    responses,
+    page_seconds=None,
+    page_items=None
+) -> Dict[str, np.ndarray]:
+    """
+    Compute all careless-responding indicators for a batch.
+
+    Args:
+        responses: (n_rows, 100) raw answers 1-5
+        page_seconds: Optional (n_rows, n_pages) seconds spent per page
+        page_items: Optional (n_rows, n_pages) items shown per page (default 10)
+
+    Returns:
+        Dict of indicator arrays plus 'flags' (n_rows x n_flags bool) and 'valid'
+    """
+    matrix = np.asarray(responses, dtype=float)
+    if matrix.ndim != 2 or matrix.shape[1] != N_ITEMS:
+        raise ValueError(f"Expected shape (n, {N_ITEMS}), got {matrix.shape}")
+
+    forward, reverse = keyed_pair_means(matrix)
+    indicators = {
+        'longstring': longstring(matrix),
+        'irv': irv(matrix),
+        'acquiescence': acquiescence(forward, reverse),
+        'inconsistency': inconsistency(forward, reverse),
+        'min_seconds_per_item': (
+            min_seconds_per_item(page_seconds, page_items) if page_seconds is not None
+            else np.full(matrix.shape[0], np.nan)
+        )
+    }
+
+    return _apply_thresholds(indicators)
+
+
+def _apply_thresholds(indicators: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Add 'flags' and 'valid'; NaN indicators (not measurable) never flag."""
+    with np.errstate(invalid='ignore'):
+        flags = {
+            'longstring': indicators['longstring'] >= MAX_LONGSTRING,
+            'low_variability': indicators['irv'] < MIN_IRV,
+            'acquiescence': np.abs(indicators['acquiescence']) > MAX_ACQUIESCENCE,
+            'inconsistency': indicators['inconsistency'] > MAX_INCONSISTENCY,
+            'speeding': indicators['min_seconds_per_item'] < MIN_SECONDS_PER_ITEM
+        }
+
+    invalidating = np.any([flags[f] for f in INVALIDATING_FLAGS], axis=0)
+    soft_count = np.sum([flags[f] for f in flags if f not in INVALIDATING_FLAGS], axis=0)
+    indicators['flags'] = flags
+    indicators['valid'] = ~invalidating & (soft_count < 2)
+    return indicators
+
+
+def assess_batch_quality(responses, page_seconds=None, page_items=None) -> List[ResponseQuality]:
+    """Screen a batch of protocols. Returns one ResponseQuality per row."""
+    return _to_results(compute_quality_indicators(responses, page_seconds, page_items))
+
+
+def _to_results(indicators: Dict[str, np.ndarray]) -> List[ResponseQuality]:
+    def optional(value: float, digits: int) -> Optional[float]:
+        return None if np.isnan(value) else round(float(value), digits)
+
+    flags = indicators['flags']
+    results = []
+    for row in range(len(indicators['valid'])):
+        results.append(ResponseQuality(
+            longstring=int(indicators['longstring'][row]),
+            irv=round(float(indicators['irv'][row]), 3),
+            acquiescence=optional(indicators['acquiescence'][row], 3),
+            inconsistency=optional(indicators['inconsistency'][row], 3),
+            min_seconds_per_item=optional(indicators['min_seconds_per_item'][row], 2),
+            flags=[name for name, mask in flags.items() if mask[row]],
+            valid=bool(indicators['valid'][row])
+        ))
+    return results
+
+
+def assess_response_quality(
+    responses: List[int],
+    page_seconds: Optional[List[float]] = None,
+    page_items: Optional[List[int]] = None
+) -> ResponseQuality:
+    """Screen a single 100-item protocol."""
+    return assess_batch_quality(
+        [responses],
+        None if page_seconds is None else [page_seconds],
+        None if page_items is None else [page_items]
+    )[0]
+
+
+def assess_partial_quality(
+    administered: Dict[int, int],
+    item_seconds: Optional[List[float]] = None
+) -> ResponseQuality:
+    """
+    Screen an adaptive (short-form) protocol.
+
+    Args:
+        administered: item id -> raw answer, in the order the items were shown
+        item_seconds: Optional seconds per item, same order
+
+    Longstring runs over the administration order; IRV over the answers given;
+    acquiescence and inconsistency over the forward/reverse items that were
+    given (None when no aspect has both); speeding uses the fastest run of
+    ITEMS_PER_PAGE consecutive items, matching the full form's page pace.
+    """
+    ids = list(administered)
+    answers = np.array([administered[i] for i in ids], dtype=float)[None, :]
+
+    forward, reverse, gaps = [], [], []
+    for aspect in ASPECT_RANGES:
+        fwd = [administered[i + 1] for i in _FORWARD_INDEX[aspect] if i + 1 in administered]
+        rev = [administered[i + 1] for i in _REVERSE_INDEX[aspect] if i + 1 in administered]
+        forward += fwd
+        reverse += rev
+        if fwd and rev:
+            gaps.append(abs(np.mean(fwd) - (6 - np.mean(rev))))
+    acq = ((np.mean(forward) + np.mean(reverse)) / 2 - 3) if forward and reverse else np.nan
+
+    pace = np.nan
+    if item_seconds is not None and len(item_seconds) >= ITEMS_PER_PAGE:
+        windows = np.convolve(np.asarray(item_seconds, dtype=float), np.ones(ITEMS_PER_PAGE), 'valid')
+        pace = windows.min() / ITEMS_PER_PAGE
+
+    indicators = {
+        'longstring': longstring(answers),
+        'irv': irv(answers),
+        'acquiescence': np.array([acq]),
+        'inconsistency': np.array([np.mean(gaps) if gaps else np.nan]),
+        'min_seconds_per_item': np.array([pace])
+    }
+    return _to_results(_apply_thresholds(indicators))[0]
+
+
+# ============================================================================
+# OUTPUT FORMATTING
+# ============================================================================
+
+def format_response_quality(quality: ResponseQuality) -> Dict:
+    """Format screening result for JSON export."""
+    return {
+        'valid': quality.valid,
+        'flags': quality.flags,
+        'indicators': {
+            'longstring': quality.longstring,
+            'irv': quality.irv,
+            'acquiescence': quality.acquiescence,
+            'inconsistency': quality.inconsistency,
+            'min_seconds_per_item': quality.min_seconds_per_item
+        }
+    }
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == '__main__':
+    import os
+
+    with open(os.path.join(os.path.dirname(__file__), 'test_profiles.json'), 'r') as f:
+        test_profiles = json.load(f)
+
+    names = list(test_profiles)
+    batch = [test_profiles[name]['responses'] for name in names]
+    for name, quality in zip(names, assess_batch_quality(batch)):
+        print(f"{name:22s} {json.dumps(format_response_quality(quality))}")
+
+    print(json.dumps(format_response_quality(assess_response_quality([3] * 100)), indent=2))
@@ -5,7 +5,8 @@ No LLM dependencies - pure Python logic.
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from scipy.stats import norm
 import json
 
@@ -63,6 +64,27 @@ FEMALE_ADJUSTMENTS = {
     'politeness': 0.19     # d=0.36 → ~0.19 mean difference
 }
 
+# Gender vocabulary -> canonical gender. The Swedish terms are kept for the
+# original deployment; bfas_locales registers every locale's terms at import
+GENDER_ALIASES = {
+    'male': 'male', 'man': 'male', 'manlig': 'male',
+    'female': 'female', 'woman': 'female', 'kvinna': 'female', 'kvinnlig': 'female'
+}
+
+CANONICAL_GENDERS = ('male', 'female')
+
+NORM_SETS = {
+    'ESCS': ESCS_NORMS,
+    'University': UNIVERSITY_NORMS
+}
+
+# 'normal': z-score through norm.cdf (continuous, unbounded)
+# 'empirical': O(1) lookup in precomputed CDF arrays over raw totals 10-50
+SCORING_MODES = ('normal', 'empirical')
+
+RAW_SCORE_MIN = 10
+RAW_SCORE_MAX = 50
+
 ASPECT_TO_DIMENSION = {
     'openness': 'openness_intellect',
     'intellect': 'openness_intellect',
@@ -150,15 +172,28 @@ def validate_responses(responses: List[int]) -> None:
             raise ValueError(f"Item {i}: response {response} out of range [1-5]")
 
 
+def validate_scoring_mode(scoring_mode: str) -> None:
+    """Validate percentile scoring mode."""
+    if scoring_mode not in SCORING_MODES:
+        raise ValueError(f"Scoring mode must be one of {list(SCORING_MODES)}, got {scoring_mode!r}")
+
+
 def validate_demographics(age: int, gender: Optional[str]) -> None:
     """Validate demographic inputs."""
     if not isinstance(age, int) or age < 17 or age > 100:
         raise ValueError(f"Age must be integer 17-100, got {age}")
     
     if gender is not None:
-        valid_genders = ['male', 'female', 'man', 'woman', 'kvinna', 'kvinnlig', 'manlig']
-        if gender.lower() not in valid_genders:
-            raise ValueError(f"Gender must be one of {valid_genders} or None")
+        if gender.lower() not in GENDER_ALIASES:
+            raise ValueError(f"Gender must be one of {sorted(GENDER_ALIASES)} or None")
+
+
+def register_gender_aliases(aliases: Dict[str, str]) -> None:
+    """Accept additional gender terms (e.g. from a locale pack) as canonical genders."""
+    for term, canonical in aliases.items():
+        if canonical not in CANONICAL_GENDERS:
+            raise ValueError(f"Gender alias {term!r} must map to one of {CANONICAL_GENDERS}")
+        GENDER_ALIASES[term.lower()] = canonical
 
 
 # ============================================================================
@@ -188,6 +223,11 @@ def calculate_aspect_raw_score(responses: List[int], aspect: str) -> int:
     return score
 
 
+def is_female(gender: Optional[str]) -> bool:
+    """True if gender selects the female norm adjustments."""
+    return bool(gender) and GENDER_ALIASES.get(gender.lower()) == 'female'
+
+
 def select_norms(age: int, gender: Optional[str]) -> tuple:
     """Select appropriate normative dataset based on age and gender."""
     # Age-based norm selection
@@ -204,7 +244,7 @@ def select_norms(age: int, gender: Optional[str]) -> tuple:
         norms[aspect] = values.copy()
     
     # Gender adjustment for females
-    if gender and gender.lower() in ['female', 'woman', 'kvinna', 'kvinnlig']:
+    if is_female(gender):
         for aspect in FEMALE_ADJUSTMENTS:
             norms[aspect]['mean'] += FEMALE_ADJUSTMENTS[aspect]
     
@@ -218,10 +258,140 @@ def calculate_percentile(mean_score: float, norm_mean: float, norm_sd: float) ->
     return round(percentile)
 
 
+# ============================================================================
+# EMPIRICAL CDF LOOKUP
+# ============================================================================
+
+# On-disk format written by save_cdf_tables()
+CDF_TABLE_FORMAT = 'bfas-cdf-tables/1'
+
+# Observed-data tables registered at runtime, keyed by (norm_set, female, aspect)
+_REGISTERED_CDF_TABLES: Dict[Tuple[str, bool, str], Tuple[int, ...]] = {}
+
+
+def build_cdf_table(norm_mean: float, norm_sd: float) -> Tuple[int, ...]:
+    """
+    Build a percentile lookup array over raw totals 10-50 from norm parameters.
+
+    The normal density is discretized onto the 41 achievable raw totals and
+    truncated to the scale bounds, so the mass the normal model places above
+    a mean of 5.0 (or below 1.0) is redistributed instead of pinning the tails.
+    Percentiles are mid-rank: P(X < raw) + P(X = raw) / 2.
+    """
+    raw_scores = range(RAW_SCORE_MIN, RAW_SCORE_MAX + 1)
+    masses = [
+        norm.cdf(((raw + 0.5) / 10 - norm_mean) / norm_sd) -
+        norm.cdf(((raw - 0.5) / 10 - norm_mean) / norm_sd)
+        for raw in raw_scores
+    ]
+    return _cdf_table_from_masses(masses)
+
+
+def raw_score_counts(raw_scores: List[int]) -> List[int]:
+    """Frequency of each raw aspect total 10-50 among observed scores."""
+    counts = [0] * (RAW_SCORE_MAX - RAW_SCORE_MIN + 1)
+    for raw in raw_scores:
+        if not RAW_SCORE_MIN <= raw <= RAW_SCORE_MAX:
+            raise ValueError(f"Raw score {raw} out of range [{RAW_SCORE_MIN}-{RAW_SCORE_MAX}]")
+        counts[raw - RAW_SCORE_MIN] += 1
+    return counts
+
+
+def build_empirical_cdf_table(raw_scores: List[int]) -> Tuple[int, ...]:
+    """Build a percentile lookup array from observed raw aspect totals (10-50)."""
+    if not raw_scores:
+        raise ValueError("Need at least one observed raw score")
+    return _cdf_table_from_masses(raw_score_counts(raw_scores))
+
+
+def _cdf_table_from_masses(masses: List[float]) -> Tuple[int, ...]:
+    total = sum(masses)
+    table = []
+    below = 0.0
+    for mass in masses:
+        table.append(round((below + mass / 2) / total * 100))
+        below += mass
+    return tuple(table)
+
+
+def register_cdf_table(norm_set: str, aspect: str, raw_scores: List[int],
+                       female: bool = False) -> None:
+    """Replace the model-derived lookup array for one aspect with observed data."""
+    register_cdf_counts(norm_set, aspect, raw_score_counts(raw_scores), female)
+
+
+def register_cdf_counts(norm_set: str, aspect: str, counts: List[int],
+                        female: bool = False) -> None:
+    """Like register_cdf_table, from a frequency per raw total 10-50."""
+    if norm_set not in NORM_SETS:
+        raise ValueError(f"Unknown norm set {norm_set!r}")
+    if aspect not in ASPECT_RANGES:
+        raise ValueError(f"Unknown aspect {aspect!r}")
+    if len(counts) != RAW_SCORE_MAX - RAW_SCORE_MIN + 1 or min(counts) < 0 or sum(counts) == 0:
+        raise ValueError(f"{norm_set}/{aspect}: need {RAW_SCORE_MAX - RAW_SCORE_MIN + 1} "
+                         f"non-negative counts with at least one observation")
+    _REGISTERED_CDF_TABLES[(norm_set, female, aspect)] = _cdf_table_from_masses(counts)
+    get_cdf_tables.cache_clear()
+
+
+def save_cdf_tables(path: str, counts: Dict[Tuple[str, bool, str], List[int]],
+                    source: str = '') -> None:
+    """
+    Persist observed raw-total frequencies as JSON, one entry per
+    (norm_set, female, aspect). Counts (not percentiles) are stored so files
+    from several samples can be merged by adding them.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': CDF_TABLE_FORMAT,
+            'source': source,
+            'raw_score_range': [RAW_SCORE_MIN, RAW_SCORE_MAX],
+            'tables': [
+                {'norm_set': norm_set, 'female': female, 'aspect': aspect,
+                 'n': int(sum(values)), 'counts': [int(c) for c in values]}
+                for (norm_set, female, aspect), values in sorted(counts.items())
+            ]
+        }, f, indent=1)
+
+
+def load_cdf_tables(path: str) -> int:
+    """Register every table in a save_cdf_tables() file; returns how many."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('format') != CDF_TABLE_FORMAT:
+        raise ValueError(f"{path}: expected format {CDF_TABLE_FORMAT!r}, got {data.get('format')!r}")
+    for entry in data['tables']:
+        register_cdf_counts(entry['norm_set'], entry['aspect'], entry['counts'], bool(entry['female']))
+    return len(data['tables'])
+
+
+@lru_cache(maxsize=None)
+def get_cdf_tables(norm_set: str, female: bool) -> Dict[str, Tuple[int, ...]]:
+    """Percentile lookup arrays per aspect for a norm set and gender branch."""
+    base_norms = NORM_SETS[norm_set]
+    tables = {}
+    for aspect, values in base_norms.items():
+        registered = _REGISTERED_CDF_TABLES.get((norm_set, female, aspect))
+        if registered is not None:
+            tables[aspect] = registered
+            continue
+        mean = values['mean']
+        if female and aspect in FEMALE_ADJUSTMENTS:
+            mean += FEMALE_ADJUSTMENTS[aspect]
+        tables[aspect] = build_cdf_table(mean, values['sd'])
+    return tables
+
+
+def lookup_percentile(raw_score: int, table: Tuple[int, ...]) -> int:
+    """Map a raw aspect total (10-50) to a percentile via a CDF lookup array."""
+    return table[raw_score - RAW_SCORE_MIN]
+
+
 def calculate_all_scores(
     responses: List[int],
     age: int,
-    gender: Optional[str] = None
+    gender: Optional[str] = None,
+    scoring_mode: str = 'normal'
 ) -> BFASProfile:
     """
     Main scoring function. Returns complete BFAS profile.
@@ -230,31 +400,69 @@ def calculate_all_scores(
         responses: List of 100 integers (1-5)
         age: Integer 17-100
         gender: Optional str ('male', 'female', etc.)
+        scoring_mode: 'normal' (z-score CDF) or 'empirical' (lookup arrays)
     
     Returns:
         BFASProfile with all scores, asymmetries, and clinical flags
     """
     validate_responses(responses)
+    
+    raw_scores = {
+        aspect: calculate_aspect_raw_score(responses, aspect)
+        for aspect in ASPECT_RANGES.keys()
+    }
+    return calculate_scores_from_raw(raw_scores, age, gender, scoring_mode)
+
+
+def calculate_scores_from_raw(
+    raw_scores: Dict[str, int],
+    age: int,
+    gender: Optional[str] = None,
+    scoring_mode: str = 'normal'
+) -> BFASProfile:
+    """
+    Build a complete BFAS profile from raw aspect totals.
+    
+    Used directly when item responses are not all available (e.g. the
+    adaptive short form estimates the totals).
+    
+    Args:
+        raw_scores: Raw total (10-50) for each of the 10 aspects
+        age: Integer 17-100
+        gender: Optional str ('male', 'female', etc.)
+        scoring_mode: 'normal' (z-score CDF) or 'empirical' (lookup arrays)
+    
+    Returns:
+        BFASProfile with all scores, asymmetries, and clinical flags
+    """
+    for aspect in ASPECT_RANGES.keys():
+        raw = raw_scores.get(aspect)
+        if not isinstance(raw, int) or not RAW_SCORE_MIN <= raw <= RAW_SCORE_MAX:
+            raise ValueError(f"{aspect}: raw score must be integer {RAW_SCORE_MIN}-{RAW_SCORE_MAX}, got {raw}")
     validate_demographics(age, gender)
+    validate_scoring_mode(scoring_mode)
     
     norms, norm_set = select_norms(age, gender)
+    cdf_tables = (
+        get_cdf_tables(norm_set, is_female(gender))
+        if scoring_mode == 'empirical' else None
+    )
     aspect_scores = {}
     dimension_scores = {}
     
     # Calculate aspect scores
     for aspect in ASPECT_RANGES.keys():
-        raw_score = calculate_aspect_raw_score(responses, aspect)
+        raw_score = raw_scores[aspect]
         mean_score = raw_score / 10  # BFAS uses mean item scores
         
         norm = norms[aspect]
-        percentile = calculate_percentile(mean_score, norm['mean'], norm['sd'])
+        if cdf_tables is not None:
+            percentile = lookup_percentile(raw_score, cdf_tables[aspect])
+        else:
+            percentile = calculate_percentile(mean_score, norm['mean'], norm['sd'])
         z_score = (mean_score - norm['mean']) / norm['sd']
         
-        gender_adjusted = (
-            gender and 
-            gender.lower() in ['female', 'woman', 'kvinna', 'kvinnlig'] and
-            aspect in FEMALE_ADJUSTMENTS
-        )
+        gender_adjusted = is_female(gender) and aspect in FEMALE_ADJUSTMENTS
         
         aspect_scores[aspect] = AspectScore(
             aspect=aspect,
@@ -296,6 +504,33 @@ def calculate_all_scores(
     )
 
 
+def calculate_batch_scores(
+    records: List[Dict],
+    scoring_mode: str = 'normal'
+) -> List[BFASProfile]:
+    """
+    Score a batch of respondents with a shared scoring mode.
+
+    Args:
+        records: Dicts with 'responses', 'age' and optional 'gender'
+            (same shape as test_profiles.json entries)
+        scoring_mode: Applied to every record in the batch
+
+    Returns:
+        One BFASProfile per record, in input order
+    """
+    validate_scoring_mode(scoring_mode)
+    return [
+        calculate_all_scores(
+            record['responses'],
+            record['age'],
+            record.get('gender'),
+            scoring_mode=scoring_mode
+        )
+        for record in records
+    ]
+
+
 # ============================================================================
 # PATTERN DETECTION
 # ============================================================================
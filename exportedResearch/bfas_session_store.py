@@ -0,0 +1,178 @@
+"""
+BFAS Session Persistence
+Checkpoints in-progress assessments to local SQLite under an anonymous resume
+token, so a dropped connection or server restart does not lose answers.
+Writes are batched on a background thread (write-behind); the caller only
+enqueues. Stale sessions expire automatically.
+"""
+
+from typing import Dict, Optional
+import atexit
+import json
+import secrets
+import sqlite3
+import threading
+import time
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+# Sessions untouched for this long are deleted (keeps no lasting data)
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Pending checkpoints are written in one transaction at most this often
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# How often the writer sweeps expired rows
+PURGE_INTERVAL = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def new_resume_token() -> str:
+    """Random URL-safe token; carries no information about the respondent."""
+    return secrets.token_urlsafe(16)
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class SessionStore:
+    """
+    SQLite-backed checkpoint store with write-behind batching.
+
+    checkpoint() and delete() return immediately; a daemon thread coalesces
+    pending writes per token and commits them together. load() sees pending
+    writes first, so a checkpoint is readable before it is flushed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+
+        # token -> (state JSON, timestamp), or None for a pending delete
+        self._pending: Dict[str, Optional[tuple]] = {}
+        # Batch being written by flush(); still visible to load() until committed
+        self._in_flight: Dict[str, Optional[tuple]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_purge = 0.0
+
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SCHEMA)
+
+        self._writer = threading.Thread(target=self._run, name='bfas-session-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    # -- public API ----------------------------------------------------------
+
+    def checkpoint(self, token: str, state: Dict) -> None:
+        """Queue the latest state for a token. Non-blocking."""
+        payload = (json.dumps(state), time.time())
+        with self._lock:
+            self._pending[token] = payload
+
+    def delete(self, token: str) -> None:
+        """Queue removal of a token's checkpoint. Non-blocking."""
+        with self._lock:
+            self._pending[token] = None
+
+    def load(self, token: str) -> Optional[Dict]:
+        """Return the latest unexpired state for a token, or None."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for queue in (self._pending, self._in_flight):
+                if token in queue:
+                    payload = queue[token]
+                    if payload is None or payload[1] < cutoff:
+                        return None
+                    return json.loads(payload[0])
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT state FROM sessions WHERE token = ? AND updated_at >= ?',
+                (token, cutoff)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def flush(self) -> None:
+        """Write all pending checkpoints in one transaction and purge if due."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._in_flight = pending
+
+            now = time.time()
+            purge = now - self._last_purge >= PURGE_INTERVAL
+            if not pending and not purge:
+                return
+
+            conn = self._connect()
+            try:
+                with conn:
+                    upserts = [(t, p[0], p[1]) for t, p in pending.items() if p is not None]
+                    deletes = [(t,) for t, p in pending.items() if p is None]
+                    if upserts:
+                        conn.executemany(
+                            'INSERT INTO sessions (token, state, updated_at) VALUES (?, ?, ?) '
+                            'ON CONFLICT(token) DO UPDATE SET state = excluded.state, '
+                            'updated_at = excluded.updated_at',
+                            upserts
+                        )
+                    if deletes:
+                        conn.executemany('DELETE FROM sessions WHERE token = ?', deletes)
+                    if purge:
+                        conn.execute('DELETE FROM sessions WHERE updated_at < ?',
+                                     (now - self.ttl_seconds,))
+                        self._last_purge = now
+            except sqlite3.Error:
+                # Put the batch back (newer writes win) and retry next cycle
+                with self._lock:
+                    for token, payload in pending.items():
+                        self._pending.setdefault(token, payload)
+                raise
+            finally:
+                with self._lock:
+                    self._in_flight = {}
+                conn.close()
+
+    def close(self) -> None:
+        """Stop the writer thread after a final flush."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._writer.join(timeout=5)
+        self.flush()
+
+    # -- writer thread -------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # pending batch was re-queued; retry on the next tick
@@ -0,0 +1,319 @@
+"""
+BFAS Local Interpretation Engine
+Deterministic, offline report text assembled from knowledge-base snippets.
+The knowledge base is parsed once per process into an index keyed by
+aspect x percentile band, within-domain combination and clinical pattern;
+generating a report is then a handful of dictionary lookups.
+Used as the instant first render and as the fallback when the LLM is down.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import os
+import re
+
+from bfas_scoring import ASPECT_RANGES, ASPECT_TO_DIMENSION
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+KB_PATH = os.path.join(os.path.dirname(__file__), 'BFAS_Complete_RAG_Knowledge_Base.md')
+
+# (upper bound exclusive, band id, placement phrase) - mirrors section 6 of the KB
+PERCENTILE_BANDS = [
+    (10, 'very_low', 'among the lowest 10% of people'),
+    (25, 'low', 'lower than about three quarters of people'),
+    (40, 'low_average', 'in the low-average range'),
+    (60, 'average', 'close to the population average'),
+    (75, 'moderately_high', 'higher than most people'),
+    (90, 'high', 'in the top quarter of people'),
+    (101, 'very_high', 'in the top 10% of people'),
+]
+
+# KB decision-tree headings -> scoring engine pattern ids
+CLINICAL_HEADINGS = {
+    'MAXIMUM DYSREGULATION': 'max_dysregulation',
+    'VIOLENCE/AGGRESSION RISK': 'aggression_risk',
+    'SEVERE DEPRESSION/SUICIDE RISK': 'depression_suicide_risk',
+    'IMPULSIVE SELF-HARM': 'impulsive_selfharm',
+    'PSYCHOSIS-PRONENESS': 'psychosis_proneness',
+    'HYPOMANIA RISK': 'hypomania_risk',
+}
+
+# Combination bullets with these terms are kept out of non-clinical text
+CLINICAL_TERMS = ('screen', 'risk', 'red flag', 'psychosis', 'disorder', 'adhd',
+                  'intervention', 'psychopathology', 'bipolar')
+
+DOMAIN_NAMES = {
+    'openness_intellect': 'Openness/Intellect',
+    'conscientiousness': 'Conscientiousness',
+    'extraversion': 'Extraversion',
+    'agreeableness': 'Agreeableness',
+    'neuroticism': 'Neuroticism',
+}
+
+# How the app uses the local report: 'preview' (shown until the LLM text
+# arrives, kept if the call fails), 'fallback' (only on failure), 'only' (no LLM)
+LOCAL_INTERPRETATION_MODES = ('preview', 'fallback', 'only')
+
+# Language the phrase templates below are written in; packs with another
+# interpretation language get no local report
+TEMPLATE_LANGUAGE = 'English'
+
+DISCLAIMER = ("*This interpretation was assembled automatically from the research summary "
+              "behind the BFAS. It is educational, not a diagnosis.*")
+
+_COMBINATION = re.compile(
+    r'^\*\*(High|Low|Moderate) (\w+)(?: \([^)]*\))? \+ (High|Low|Moderate) (\w+)(?: \([^)]*\))?:\*\*$'
+)
+
+
+# ============================================================================
+# DATA STRUCTURES
+# ============================================================================
+
+@dataclass
+class SnippetIndex:
+    high_signatures: Dict[str, List[str]] = field(default_factory=dict)
+    low_signatures: Dict[str, List[str]] = field(default_factory=dict)
+    high_templates: Dict[str, str] = field(default_factory=dict)  # 85th+ percentile, second person
+    # (aspect_a, level_a, aspect_b, level_b) -> lines
+    combinations: Dict[Tuple[str, str, str, str], List[str]] = field(default_factory=dict)
+    clinical: Dict[str, List[str]] = field(default_factory=dict)  # pattern -> 'Risk:'/'Note:' lines
+
+
+# ============================================================================
+# INDEX CONSTRUCTION
+# ============================================================================
+
+def build_snippet_index(kb_text: str) -> SnippetIndex:
+    """Parse the knowledge base markdown into a snippet index."""
+    index = SnippetIndex()
+    aspect = None
+    target: Optional[List[str]] = None
+    expect_template = False
+    clinical_pattern = None
+
+    for raw_line in kb_text.splitlines():
+        line = raw_line.strip()
+
+        if line.startswith('#'):
+            heading = line.lstrip('#').strip()
+            name = heading.split(':')[0].strip().lower()
+            aspect = name if line.startswith('#### ') and name in ASPECT_RANGES else None
+            target, expect_template, clinical_pattern = None, False, None
+            continue
+
+        if expect_template and line:
+            index.high_templates[aspect] = line.strip('"')
+            expect_template = False
+            continue
+
+        if line.startswith('**'):
+            target, clinical_pattern = None, None
+            combination = _COMBINATION.match(line)
+            heading = line.strip('*').rstrip(':')
+            if combination:
+                level_a, name_a, level_b, name_b = combination.groups()
+                key = (name_a.lower(), level_a.lower(), name_b.lower(), level_b.lower())
+                target = index.combinations.setdefault(key, [])
+            elif heading in CLINICAL_HEADINGS:
+                clinical_pattern = CLINICAL_HEADINGS[heading]
+                index.clinical.setdefault(clinical_pattern, [])
+            elif aspect and line.startswith(f'**High {aspect.title()}'):
+                target = index.high_signatures.setdefault(aspect, [])
+            elif aspect and line.startswith(f'**Low {aspect.title()}'):
+                target = index.low_signatures.setdefault(aspect, [])
+            elif aspect and line.startswith('**Interpretation template'):
+                expect_template = True
+            continue
+
+        if clinical_pattern:
+            text = line.lstrip('- ').strip()
+            if text.startswith(('Risk:', 'Note:')):
+                index.clinical[clinical_pattern].append(text)
+        elif target is not None:
+            if line.startswith('- '):
+                target.append(line[2:].replace('**', '').strip())
+            elif line.startswith('"'):
+                target.append(line.strip('"'))
+
+    return index
+
+
+@lru_cache(maxsize=None)
+def load_snippet_index(path: str = KB_PATH) -> SnippetIndex:
+    """Snippet index for a knowledge base file, built once per process."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_snippet_index(f.read())
+
+
+# ============================================================================
+# TEXT ASSEMBLY
+# ============================================================================
+
+def percentile_band(percentile: int) -> Tuple[str, str]:
+    """Band id and placement phrase for a percentile."""
+    for upper, band, phrase in PERCENTILE_BANDS:
+        if percentile < upper:
+            return band, phrase
+    return PERCENTILE_BANDS[-1][1:]
+
+
+def _title(aspect: str) -> str:
+    return aspect.replace('_', ' ').title()
+
+
+def _ordinal(n: int) -> str:
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f'{n}{suffix}'
+
+
+def _as_clause(bullets: List[str], limit: int = 3) -> str:
+    """'Rapid mood shifts, irritability' -> 'rapid mood shifts, irritability; ...'"""
+    parts = []
+    for bullet in bullets[:limit]:
+        first = bullet.split()[0] if bullet else ''
+        parts.append(bullet if first.isupper() and len(first) > 1 else bullet[:1].lower() + bullet[1:])
+    return '; '.join(parts)
+
+
+def _non_clinical(lines: List[str]) -> List[str]:
+    return [line for line in lines if not any(term in line.lower() for term in CLINICAL_TERMS)]
+
+
+def describe_aspect(aspect: str, percentile: int, index: SnippetIndex) -> str:
+    """One or two sentences for an aspect at a percentile."""
+    band, phrase = percentile_band(percentile)
+    opening = f"Your {_title(aspect)} ({_ordinal(percentile)} percentile) is {phrase}."
+
+    if percentile >= 85 and aspect in index.high_templates:
+        return f"{opening} {index.high_templates[aspect]}"
+    if percentile >= 75 and index.high_signatures.get(aspect):
+        return f"{opening} This typically shows up as {_as_clause(index.high_signatures[aspect])}."
+    if percentile <= 25 and index.low_signatures.get(aspect):
+        return f"{opening} This typically shows up as {_as_clause(index.low_signatures[aspect])}."
+    if band in ('low_average', 'moderately_high'):
+        direction = 'a little less' if band == 'low_average' else 'somewhat more'
+        return f"{opening} You show {direction} of this tendency than most, without it defining you."
+    return f"{opening} You show a typical level of this tendency."
+
+
+def _level(percentile: int) -> str:
+    if 40 <= percentile <= 60:
+        return 'moderate'
+    return 'high' if percentile > 60 else 'low'
+
+
+def combination_lines(aspect_a: str, aspect_b: str, percentiles: Dict[str, int],
+                      index: SnippetIndex) -> List[str]:
+    """KB combination snippet matching both aspects' levels, in either heading order."""
+    level_a, level_b = _level(percentiles[aspect_a]), _level(percentiles[aspect_b])
+    return (index.combinations.get((aspect_a, level_a, aspect_b, level_b))
+            or index.combinations.get((aspect_b, level_b, aspect_a, level_a))
+            or [])
+
+
+def describe_asymmetry(asymmetry: Dict, percentiles: Dict[str, int], index: SnippetIndex) -> str:
+    """Asymmetry paragraph using the KB combination snippet for the domain."""
+    higher = asymmetry['higher_aspect']
+    lower = [a for a in asymmetry['aspects'] if a != higher][0]
+    domain = DOMAIN_NAMES.get(asymmetry['domain'], _title(asymmetry['domain']))
+    text = (f"An interesting pattern in your profile is the gap within {domain}: "
+            f"you score at the {_ordinal(percentiles[higher])} percentile for {_title(higher)} "
+            f"but the {_ordinal(percentiles[lower])} for {_title(lower)}, "
+            f"a difference of {asymmetry['percentile_difference']} points.")
+
+    lines = _non_clinical(combination_lines(higher, lower, percentiles, index))
+    if lines and len(lines) == 1 and len(lines[0].split()) > 12:
+        text += f" {lines[0]}"
+    elif lines:
+        text += f" This combination is typically described as {_as_clause(lines)}."
+    return text
+
+
+def describe_flag(flag: Dict, index: SnippetIndex) -> str:
+    # 'Risk:' lines restate the engine's message; only the KB notes add context
+    notes = [line.split(':', 1)[1].strip() for line in index.clinical.get(flag['pattern'], [])
+             if line.startswith('Note:')]
+    detail = f" Note: {'; '.join(notes)}." if notes else ''
+    return f"**{_title(flag['pattern'])}** — {flag['message']}.{detail}"
+
+
+def generate_local_interpretation(profile_summary: Dict, index: Optional[SnippetIndex] = None) -> str:
+    """
+    Assemble a markdown interpretation from format_profile_summary output.
+
+    Args:
+        profile_summary: Dict from format_profile_summary
+        index: Snippet index (defaults to the bundled knowledge base)
+
+    Returns:
+        Markdown report text
+    """
+    index = index or load_snippet_index()
+    percentiles = {a: s['percentile'] for a, s in profile_summary['aspect_scores'].items()}
+    ranked = sorted(percentiles, key=lambda a: abs(percentiles[a] - 50), reverse=True)
+
+    sections = []
+
+    distinctive = [f"{'high' if percentiles[a] >= 50 else 'low'} {_title(a)} "
+                   f"({_ordinal(percentiles[a])} percentile)" for a in ranked[:2]]
+    sections.append(f"What stands out most in your profile is your {distinctive[0]}, "
+                    f"together with your {distinctive[1]}.")
+
+    by_domain: Dict[str, List[str]] = {}
+    for aspect in percentiles:
+        by_domain.setdefault(ASPECT_TO_DIMENSION[aspect], []).append(aspect)
+    for domain, aspects in by_domain.items():
+        sections.append(f"**{DOMAIN_NAMES[domain]}.** " +
+                        ' '.join(describe_aspect(a, percentiles[a], index) for a in aspects))
+
+    for asymmetry in profile_summary['asymmetries']:
+        sections.append(describe_asymmetry(asymmetry, percentiles, index))
+
+    strengths = [a for a in ranked if percentiles[a] >= 75 and a not in ('withdrawal', 'volatility')]
+    if strengths:
+        sections.append("Key strengths to build on: " +
+                        ', '.join(_title(a) for a in strengths[:3]) + '.')
+
+    if profile_summary['clinical_flags']:
+        sections.append(
+            "Your scores also match some patterns that research links to particular difficulties. "
+            "These are statistical associations, not a diagnosis; if any of this resonates, "
+            "a licensed professional can help you look at it properly.\n\n" +
+            '\n'.join(f"- {describe_flag(flag, index)}" for flag in profile_summary['clinical_flags'])
+        )
+
+    sections.append("Does this description match your experience? Personality describes tendencies, "
+                    "not limits, and knowing your pattern is the first step to using it well.")
+    sections.append(DISCLAIMER)
+    return '\n\n'.join(sections)
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == '__main__':
+    import json
+    import time
+    from bfas_scoring import calculate_all_scores, format_profile_summary
+
+    with open(os.path.join(os.path.dirname(__file__), 'test_profiles.json'), 'r') as f:
+        test_profiles = json.load(f)
+
+    profile = test_profiles['sara_phd']
+    summary = format_profile_summary(calculate_all_scores(profile['responses'], profile['age'], profile['gender']))
+
+    start = time.perf_counter()
+    index = load_snippet_index()
+    built = time.perf_counter()
+    text = generate_local_interpretation(summary, index)
+    done = time.perf_counter()
+
+    print(text)
+    print(f"\n[index {1000 * (built - start):.2f} ms, report {1000 * (done - built):.2f} ms]")